@@ -1,10 +1,124 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any, Optional, Deque, Iterable, Set, FrozenSet
 from datetime import datetime
 import json
+import logging
+import re
+import sys
+import time
+from collections import deque
+
+from config.agent_config import SYSTEM_CONFIG
+
+try:
+    import orjson  # optional, faster JSON parsing and debug log rendering
+except ImportError:
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+
+def ts_to_iso(timestamp_ns: int) -> str:
+    """Format a time.time_ns() timestamp as an ISO-8601 string"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
+
+
+def json_loads(text: str) -> Any:
+    """Parse JSON text, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+class _LazyJSON:
+    """Defers pretty-printing of log data until a handler actually emits it"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Any):
+        self.data = data
+
+    def __str__(self) -> str:
+        if orjson is not None:
+            json_str = orjson.dumps(self.data, option=orjson.OPT_INDENT_2).decode()
+        else:
+            json_str = json.dumps(self.data, indent=2)
+        return '\n'.join('    ' + line for line in json_str.split('\n'))
+
+
+class KeywordIndex:
+    """
+    Maps keywords to tags (e.g. agent names) and finds every tag whose
+    keywords occur in a text with a single regex pass.
+    
+    Matching has the same substring semantics as
+    `any(keyword in text for keyword in keywords)`, for all tags at once.
+    """
+
+    def __init__(self, table: Optional[Dict[str, Iterable[str]]] = None):
+        self._tags: Dict[str, Set[str]] = {}
+        self._pattern: Optional[re.Pattern] = None
+        self._expanded: Dict[str, FrozenSet[str]] = {}
+        for tag, keywords in (table or {}).items():
+            self.add(tag, keywords)
+
+    def add(self, tag: str, keywords: Iterable[str]):
+        """Register keywords for a tag (idempotent)"""
+        changed = False
+        for keyword in keywords:
+            tags = self._tags.setdefault(keyword, set())
+            if tag not in tags:
+                tags.add(tag)
+                changed = True
+        if changed:
+            self._pattern = None
+
+    def _compile(self) -> re.Pattern:
+        # Longest keywords first, so the lookahead reports the longest keyword
+        # starting at each position. Any shorter keyword starting there is a
+        # prefix of it, so its tags are folded into the longer keyword's tags.
+        keywords = sorted(self._tags, key=len, reverse=True)
+        self._expanded = {
+            keyword: frozenset().union(*(
+                self._tags[other] for other in keywords if keyword.startswith(other)
+            ))
+            for keyword in keywords
+        }
+        self._pattern = re.compile(
+            "(?=(" + "|".join(re.escape(keyword) for keyword in keywords) + "))"
+        )
+        return self._pattern
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """Return the set of tags whose keywords occur in text"""
+        if not self._tags:
+            return frozenset()
+        pattern = self._pattern or self._compile()
+        tags: Set[str] = set()
+        for match in pattern.finditer(text):
+            tags |= self._expanded[match.group(1)]
+        return frozenset(tags)
+
+
+# Routing keywords of every agent, shared so a query is scanned once for all agents
+CAPABILITY_INDEX = KeywordIndex()
+
+# Customer ID patterns like "ID 12345", "customer 12345" or "#12345", in
+# priority order (an earlier pattern wins even if a later one matches first)
+CUSTOMER_ID_PATTERNS = (
+    re.compile(r'id\s+(\d+)'),
+    re.compile(r'customer\s+(\d+)'),
+    re.compile(r'#(\d+)')
+)
+
+
+def find_customer_id(query_lower: str) -> Optional[str]:
+    """Return the customer ID mentioned in a lowercased query, if any"""
+    for pattern in CUSTOMER_ID_PATTERNS:
+        match = pattern.search(query_lower)
+        if match:
+            return match.group(1)
+    return None
 
-from typing import Dict, List, Any, Optional
-from datetime import datetime
-import json
 
 class BaseAgent:
     """
@@ -12,6 +126,13 @@ class BaseAgent:
     Agents communicate via message passing only.
     """
 
+    # Fixed attribute layout; subclasses declare their own extra slots
+    __slots__ = (
+        "name", "role", "description", "system_instruction",
+        "capabilities", "mcp_tools", "routing_keywords", "message_bus",
+        "private_memory", "interaction_history"
+    )
+
     def __init__(self, config: Dict[str, Any], message_bus=None):
         """
         Initialize the agent with its configuration.
@@ -20,43 +141,73 @@ class BaseAgent:
             config: Dictionary containing agent configuration
             message_bus: MessageBus instance for A2A communication
         """
-        self.name = config["name"]
-        self.role = config["role"]
+        # Interned: names and roles are used as dict keys for message routing
+        self.name = sys.intern(config["name"])
+        self.role = sys.intern(config["role"])
         self.description = config["description"]
         self.system_instruction = config["system_instruction"]
         self.capabilities = config.get("capabilities", [])
         self.mcp_tools = config.get("mcp_tools", [])
         
+        self.routing_keywords = config.get("routing_keywords", [])
+        
+        # Make this agent discoverable by keyword
+        CAPABILITY_INDEX.add(self.name, self.routing_keywords)
+        
         # Message bus for A2A communication
         self.message_bus = message_bus
         
         # PRIVATE memory - not shared with other agents!
         self.private_memory: Dict[str, Any] = {}
         
-        # Interaction history for debugging
-        self.interaction_history: List[Dict] = []
+        # Interaction history for debugging (oldest entries are dropped)
+        self.interaction_history: Deque[Dict] = deque(
+            maxlen=SYSTEM_CONFIG["interaction_history_limit"]
+        )
         
+    @staticmethod
+    def logging_enabled() -> bool:
+        """
+        Whether interactions are recorded at all (SYSTEM_CONFIG["enable_logging"]).
+        
+        Call sites with costly payloads check this before building them.
+        """
+        return SYSTEM_CONFIG["enable_logging"]
+    
     def log_interaction(self, interaction_type: str, data: Dict[str, Any]):
         """Log an interaction for debugging"""
+        if not SYSTEM_CONFIG["enable_logging"]:
+            return
+        
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time_ns(),  # see ts_to_iso()
             "agent": self.name,
             "type": interaction_type,
             "data": data
         }
         self.interaction_history.append(log_entry)
         
-        # Print for visibility
-        json_str = json.dumps(data, indent=2)
-        indented_json = '\n'.join('    ' + line for line in json_str.split('\n'))
-        print(f"    [{self.name}] {interaction_type}:\n{indented_json}")
+        # Formatting only happens if DEBUG logging is enabled
+        log.debug("    [%s] %s:\n%s", self.name, interaction_type, _LazyJSON(data))
     
-    def send_message(self, to_agent: str, content: str, data: Optional[Dict] = None):
+    def send_message(self, to_agent: str, content: str, data: Optional[Dict] = None,
+                     correlation_id: Optional[str] = None):
         """Send message to another agent via message bus"""
         if self.message_bus:
-            return self.message_bus.send_message(self.name, to_agent, content, data)
+            return self.message_bus.send_message(self.name, to_agent, content, data, correlation_id)
+        else:
+            print(f"Warning: No message bus available for {self.name}")
+    
+    def request(self, to_agent: str, content: str, data: Optional[Dict] = None):
+        """
+        Send a message expecting a reply; returns (correlation_id, future),
+        or None if there is no message bus.
+        """
+        if self.message_bus:
+            return self.message_bus.request(self.name, to_agent, content, data)
         else:
             print(f"Warning: No message bus available for {self.name}")
+            return None
     
     def receive_message(self, timeout: float = 1.0):
         """Receive message from message bus"""
@@ -72,9 +223,11 @@ class BaseAgent:
         """Retrieve data from private memory"""
         return self.private_memory.get(key)
     
-    def can_handle(self, query: str) -> bool:
+    def can_handle(self, query: str, query_lower: Optional[str] = None) -> bool:
         """Determine if this agent can handle a given query"""
-        raise NotImplementedError("Subclasses must implement can_handle()")
+        if query_lower is None:
+            query_lower = query.lower()
+        return self.name in CAPABILITY_INDEX.match(query_lower)
     
     def process(self, query: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """Process a query and return a response"""
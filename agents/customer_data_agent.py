@@ -3,9 +3,32 @@ Customer Data Agent - Database Specialist
 Handles all customer data operations (will connect to MCP in Part 2).
 """
 
-from typing import Dict, Any, Optional
-from agents import BaseAgent
-from config.agent_config import CUSTOMER_DATA_AGENT_CONFIG
+import re
+import sys
+import time
+from typing import Dict, Any, Optional, List, Tuple
+from agents import BaseAgent, find_customer_id
+from config.agent_config import CUSTOMER_DATA_AGENT_CONFIG, SYSTEM_CONFIG
+from mcp.mcp_client import MCPClient
+
+
+_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+
+# Operation keywords, one named group per operation
+_OPERATION_RE = re.compile(
+    r'(?P<retrieve>get|show|find)|(?P<update>update|change|modify)|(?P<list>list|all)'
+)
+
+# One line of the customer list response
+_CUSTOMER_LINE = "  - Customer {id}: {name} ({status})"
+
+# Operation tags (interned, so dispatch compares by identity first)
+OP_RETRIEVE = sys.intern("retrieve")
+OP_UPDATE = sys.intern("update")
+OP_LIST = sys.intern("list")
+
+# When a query mentions several operations, the earlier one wins
+_OPERATION_PRIORITY = (OP_RETRIEVE, OP_UPDATE, OP_LIST)
 
 
 class CustomerDataAgent(BaseAgent):
@@ -14,6 +37,8 @@ class CustomerDataAgent(BaseAgent):
     In Part 2, this will connect to MCP server.
     """
     
+    __slots__ = ("mcp_client", "_list_cache")
+    
     def __init__(self, message_bus=None):
         """Initialize Customer Data Agent with message bus"""
         super().__init__(CUSTOMER_DATA_AGENT_CONFIG, message_bus)
@@ -24,20 +49,9 @@ class CustomerDataAgent(BaseAgent):
         
         # MCP client
         self.mcp_client = None
-    
-    def can_handle(self, query: str) -> bool:
-        """
-        Check if this agent can handle the query.
         
-        Args:
-            query: User query
-            
-        Returns:
-            True if query relates to customer data
-        """
-        data_keywords = ["customer", "account", "information", "details", "id", 
-                        "email", "phone", "update", "get", "list"]
-        return any(keyword in query.lower() for keyword in data_keywords)
+        # Recent list responses: (status, limit) -> (expires_at, response)
+        self._list_cache: Dict[Tuple[Optional[str], int], Tuple[float, Dict[str, Any]]] = {}
     
     def process_message(self, message):
         """
@@ -54,36 +68,114 @@ class CustomerDataAgent(BaseAgent):
         self.send_message(
             to_agent=message.from_agent,
             content="Query processed",
-            data=result
+            data=result,
+            correlation_id=message.correlation_id
         )
         
         return result
     
-    def extract_customer_id(self, query: str) -> Optional[str]:
+    def extract_customer_id(self, query: str, query_lower: Optional[str] = None) -> Optional[str]:
         """
         Extract customer ID from query using simple pattern matching.
         
         Args:
             query: User query
+            query_lower: Already-lowercased query, if the caller has one
             
         Returns:
             Customer ID if found, None otherwise
         """
-        import re
+        if query_lower is None:
+            query_lower = query.lower()
+        
+        return find_customer_id(query_lower)
+    
+    def _classify_operation(self, query_lower: str) -> str:
+        """Determine the operation type (retrieve, update or list) of a query"""
+        found = {match.lastgroup for match in _OPERATION_RE.finditer(query_lower)}
+        return next(
+            (op for op in _OPERATION_PRIORITY if op in found),
+            OP_RETRIEVE  # Default
+        )
+    
+    def _retrieve_response(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the agent response for a get_customer result"""
+        if result['success']:
+            customer = result['customer']
+            return {
+                "success": True,
+                "operation": "retrieve",
+                "customer": customer,
+                "content": f"Customer {customer['id']}: {customer['name']} ({customer['status']})"
+            }
+        else:
+            return {
+                "success": False,
+                "operation": "retrieve",
+                "content": f"Failed to retrieve customer: {result.get('error', 'Unknown error')}"
+            }
+    
+    def process_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process several customer data requests in one go.
+        
+        Queries are classified up front and the customers of consecutive
+        retrieve queries are fetched together in one MCP call, each distinct
+        customer only once. Anything other than a retrieve goes through
+        process() as usual.
+        
+        Args:
+            queries: List of user queries
+            
+        Returns:
+            List of responses, one per query (same order)
+        """
+        self.log_interaction("processing_batch", {"queries": queries})
+        
+        if not self.mcp_client:
+            self.mcp_client = MCPClient()
+        
+        lowered = [query.lower() for query in queries]
+        operations = [self._classify_operation(query_lower) for query_lower in lowered]
         
-        # Look for patterns like "ID 12345" or "customer 12345"
-        patterns = [
-            r'id\s+(\d+)',
-            r'customer\s+(\d+)',
-            r'#(\d+)'
-        ]
+        customer_ids: List[Optional[int]] = []
+        for query, query_lower, operation in zip(queries, lowered, operations):
+            customer_id = None
+            if operation == OP_RETRIEVE:
+                customer_id = self.extract_customer_id(query, query_lower)
+            customer_ids.append(int(customer_id) if customer_id else None)
         
-        for pattern in patterns:
-            match = re.search(pattern, query.lower())
-            if match:
-                return match.group(1)
+        fetched: Dict[int, Dict[str, Any]] = {}
+        results = []
+        for index, (query, operation, customer_id) in enumerate(
+                zip(queries, operations, customer_ids)):
+            if customer_id is not None:
+                if customer_id not in fetched:
+                    # Fetch this customer and those of the following retrieves
+                    # (up to the next update) in one call
+                    batch = []
+                    for later_id, later_op in zip(customer_ids[index:], operations[index:]):
+                        if later_op == OP_UPDATE:
+                            break
+                        if later_id is not None and later_id not in fetched:
+                            batch.append(later_id)
+                    fetched.update(self._fetch_customers(batch))
+                results.append(self._retrieve_response(fetched[customer_id]))
+            else:
+                # Writes may change customers we already fetched
+                if operation == OP_UPDATE:
+                    fetched.clear()
+                results.append(self.process(query))
         
-        return None
+        return results
+    
+    def _fetch_customers(self, customer_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """get_customer results for several customers, keyed by ID"""
+        result = self.mcp_client.get_customers_batch(customer_ids)
+        if result['success']:
+            return result['customers']
+        failure = {'success': False, 'error': result.get('error', 'Unknown error')}
+        return {customer_id: failure for customer_id in customer_ids}
     
     def process(self, query: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -93,113 +185,129 @@ class CustomerDataAgent(BaseAgent):
         
         query_lower = query.lower()
 
-        # initialize MCP client
+        # initialize MCP client (lazily, on first use)
         if not self.mcp_client:
-            from mcp.mcp_client import MCPClient
             self.mcp_client = MCPClient()
         
-        # Determine the operation type
-        if "get" in query_lower or "show" in query_lower or "find" in query_lower:
-            operation = "retrieve"
-        elif "update" in query_lower or "change" in query_lower or "modify" in query_lower:
-            operation = "update"
-        elif "list" in query_lower or "all" in query_lower:
-            operation = "list"
-        else:
-            operation = "retrieve"  # Default
+        # Ticket histories for a known set of customers, in one MCP call
+        if context and context.get("customer_ids"):
+            return self._handle_history_batch(context["customer_ids"])
         
-        # RETRIEVE operation
-        if operation == "retrieve":
-            customer_id = self.extract_customer_id(query)
-            if customer_id:
+        # Determine the operation type and dispatch to its handler
+        operation = self._classify_operation(query_lower)
+        handler = self._HANDLERS.get(operation, CustomerDataAgent._handle_retrieve)
+        return handler(self, query, query_lower)
+    
+    def _handle_retrieve(self, query: str, query_lower: str) -> Dict[str, Any]:
+        """RETRIEVE operation"""
+        customer_id = self.extract_customer_id(query, query_lower)
+        if customer_id:
 
-                result = self.mcp_client.get_customer(int(customer_id))
+            result = self.mcp_client.get_customer(int(customer_id))
+            return self._retrieve_response(result)
+            
+        else:
+            return {
+                "success": False,
+                "content": "Please provide a customer ID"
+            }
+    
+    def _handle_list(self, query: str, query_lower: str) -> Dict[str, Any]:
+        """LIST operation"""
 
-                if result['success']:
-                    customer = result['customer']
-                    return {
-                        "success": True,
-                        "operation": "retrieve",
-                        "customer": customer,
-                        "content": f"Customer {customer['id']}: {customer['name']} ({customer['status']})"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "operation": "retrieve",
-                        "content": f"Failed to retrieve customer: {result.get('error', 'Unknown error')}"
-                    }
-                
-            else:
-                return {
-                    "success": False,
-                    "content": "Please provide a customer ID"
-                }
-        
-        # LIST operation
-        elif operation == "list":
+        # extract status if mentioned
+        status = 'active' if 'active' in query_lower else None
+        limit = 10
 
-            # extract status if mentioned
-            status = 'active' if 'active' in query_lower else None
+        # Identical list queries within the TTL are served from memory
+        key = (status, limit)
+        cached = self._list_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return {**cached[1], "customers": list(cached[1]["customers"])}
 
-            # mcp call
-            result = self.mcp_client.list_customers(status=status, limit=10)
+        # mcp call
+        result = self.mcp_client.list_customers(status=status, limit=limit)
 
+        if result['success']:
+            customers = result['customers']
+            customer_list = "\n".join(
+                _CUSTOMER_LINE.format_map(c) for c in customers
+            )
+            response = {
+                "success": True,
+                "operation": "list",
+                "customers": customers,
+                "content": f"Found {result['count']} customers:\n{customer_list}"
+            }
+            expires_at = time.monotonic() + SYSTEM_CONFIG["list_cache_ttl_seconds"]
+            self._list_cache[key] = (expires_at, response)
+            # (copy the list too, so callers cannot change the cached one)
+            return {**response, "customers": list(customers)}
+        else:
+            return {
+                "success": False,
+                "operation": "list",
+                "content": f"Failed to list customers: {result.get('error', 'Unknown error')}"
+            }
+    
+    def _handle_update(self, query: str, query_lower: str) -> Dict[str, Any]:
+        """UPDATE operation"""
+        customer_id = self.extract_customer_id(query, query_lower)
+        if not customer_id:
+            return {
+                "success": False,
+                "content": "Please provide a customer ID to update"
+            }
+        
+        # Extract update data from query (simple email extraction for now)
+        email_match = _EMAIL_RE.search(query)
+        
+        if email_match:
+            new_email = email_match.group(0)
+            # ACTUAL MCP CALL
+            result = self.mcp_client.update_customer(int(customer_id), {'email': new_email})
+            
             if result['success']:
-                customers = result['customers']
-                customer_list = "\n".join([
-                    f"  - Customer {c['id']}: {c['name']} ({c['status']})"
-                    for c in customers
-                ])
+                # Cached customer lists may now be stale
+                self._list_cache.clear()
                 return {
                     "success": True,
-                    "operation": "list",
-                    "customers": customers,
-                    "content": f"Found {result['count']} customers:\n{customer_list}"
+                    "operation": "update",
+                    "content": f"Updated customer {customer_id}: {result['updated_fields']}"
                 }
             else:
                 return {
                     "success": False,
-                    "operation": "list",
-                    "content": f"Failed to list customers: {result.get('error', 'Unknown error')}"
-                }
-            
-        # UPDATE operation
-        elif operation == "update":
-            customer_id = self.extract_customer_id(query)
-            if not customer_id:
-                return {
-                    "success": False,
-                    "content": "Please provide a customer ID to update"
-                }
-            
-            # Extract update data from query (simple email extraction for now)
-            import re
-            email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', query)
-            
-            if email_match:
-                new_email = email_match.group(0)
-                # ACTUAL MCP CALL
-                result = self.mcp_client.update_customer(int(customer_id), {'email': new_email})
-                
-                if result['success']:
-                    return {
-                        "success": True,
-                        "operation": "update",
-                        "content": f"Updated customer {customer_id}: {result['updated_fields']}"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "content": result['error']
-                    }
-            else:
-                return {
-                    "success": False,
-                    "content": "Could not find data to update in query"
+                    "content": result['error']
                 }
+        else:
+            return {
+                "success": False,
+                "content": "Could not find data to update in query"
+            }
+    
+    def _handle_history_batch(self, customer_ids: List[int]) -> Dict[str, Any]:
+        """HISTORY operation for several customers"""
+        result = self.mcp_client.get_customer_histories_batch(customer_ids)
         
-        return {
-            "success": False,
-            "content": "Could not determine operation type"
-        }
\ No newline at end of file
+        if result['success']:
+            histories = result['histories']
+            return {
+                "success": True,
+                "operation": "history",
+                "histories": histories,
+                "content": f"Retrieved ticket history for {len(histories)} customers"
+            }
+        else:
+            return {
+                "success": False,
+                "operation": "history",
+                "content": f"Failed to retrieve histories: {result.get('error', 'Unknown error')}"
+            }
+    
+    # Operation -> handler dispatch table
+    _HANDLERS = {
+        OP_RETRIEVE: _handle_retrieve,
+        OP_LIST: _handle_list,
+        OP_UPDATE: _handle_update
+    }
@@ -1,13 +1,218 @@
-from typing import Dict, Any, Optional, List
-from agents import BaseAgent
-from config.agent_config import ROUTER_AGENT_CONFIG
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from agents import BaseAgent, KeywordIndex, json_loads
+from agents.support_agent import support_hits
+from config.agent_config import (
+    ROUTER_AGENT_CONFIG, CUSTOMER_DATA_AGENT_CONFIG, SUPPORT_AGENT_CONFIG, SYSTEM_CONFIG
+)
 from openai import OpenAI
+import functools
+import httpx
+import importlib.util
 import os
+import re
+import sys
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# One pooled HTTP client for every OpenAI call, so concurrent intent analyses
+# reuse keep-alive connections (HTTP/2 multiplexing when h2 is installed)
+_HTTP = httpx.Client(
+    http2=importlib.util.find_spec("h2") is not None,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=SYSTEM_CONFIG["response_timeout_seconds"]
+)
+
+client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'), http_client=_HTTP)
+
+# Specialist names and intent labels (interned, matching the agents' own names)
+CUSTOMER_DATA_AGENT = sys.intern(CUSTOMER_DATA_AGENT_CONFIG["name"])
+SUPPORT_AGENT = sys.intern(SUPPORT_AGENT_CONFIG["name"])
+INTENT_CUSTOMER_DATA = sys.intern("customer_data")
+INTENT_CUSTOMER_SUPPORT = sys.intern("customer_support")
+
+# Fallback intent keywords, scanned in a single pass
+_INTENT_KEYWORDS = KeywordIndex({
+    INTENT_CUSTOMER_DATA: ["customer", "account", "information", "details", "id", "email", "phone"],
+    INTENT_CUSTOMER_SUPPORT: ["help", "issue", "problem", "support", "ticket", "cancel", "refund"]
+})
+
+# Any of these in a query may call for the Support Agent, which rules out the
+# single-customer lookup fast path in analyze_intent() (as does any keyword
+# the Support Agent itself acts on, see support_hits())
+_SUPPORT_TERMS = KeywordIndex({SUPPORT_AGENT: SUPPORT_AGENT_CONFIG["routing_keywords"]})
+
+# A customer ID named as such ("customer 5", "cust #5"); unlike
+# CUSTOMER_ID_PATTERNS it does not take "paid 50" as an ID
+_FAST_PATH_ID_RE = re.compile(r"(?:customer|cust)\s*#?\s*(\d+)")
+
+# Intent -> specialist agent, in reporting order
+_INTENT_AGENTS = (
+    (INTENT_CUSTOMER_DATA, CUSTOMER_DATA_AGENT),
+    (INTENT_CUSTOMER_SUPPORT, SUPPORT_AGENT)
+)
+_SPECIALISTS = frozenset(agent_name for _, agent_name in _INTENT_AGENTS)
+
+
+# Intent analysis instructions, sent as the system message ahead of the query
+_INTENT_INSTRUCTIONS = """You are a query analyzer. Respond only with valid JSON.
+
+Analyze the customer service query and respond with JSON.
+
+Determine:
+1. What agents are needed? (Customer Data Agent, Support Agent, or both)
+2. What's the complexity? (simple, moderate, complex)
+3. What's the primary intent?
+
+Respond ONLY with valid JSON in this format:
+{
+    "primary_intent": "customer_data" | "customer_support" | "both",
+    "requires_agents": ["Customer Data Agent"] or ["Support Agent"] or ["Customer Data Agent", "Support Agent"],
+    "complexity": "simple" | "moderate" | "complex",
+    "reasoning": "brief explanation"
+}
+
+Examples:
+- "Get customer 5" → {"primary_intent": "customer_data", "requires_agents": ["Customer Data Agent"], "complexity": "simple"}
+- "I need help, customer ID 5" → {"primary_intent": "both", "requires_agents": ["Customer Data Agent", "Support Agent"], "complexity": "moderate"}"""
+
+
+# The intent fields routing depends on; anything after them (the reasoning)
+# is not waited for
+_ROUTING_KEYS = ("primary_intent", "requires_agents", "complexity")
+
+
+def _complete_prefix(partial: str) -> Optional[str]:
+    """
+    Close a streamed JSON object after its last complete field.
+    
+    Returns the closed JSON text if it parses and already holds every
+    routing key, None otherwise.
+    """
+    candidate = partial.rstrip().rstrip(",") + "}"
+    try:
+        parsed = json_loads(candidate)
+    except ValueError:
+        return None
+    if isinstance(parsed, dict) and all(key in parsed for key in _ROUTING_KEYS):
+        return candidate
+    return None
+
+
+# Routing fields of GPT analyses by query shape (the lowercased query with
+# digits masked), so "get customer 5" and "get customer 6" share one analysis
+_DIGITS_RE = re.compile(r"\d+")
+_shape_intents: "OrderedDict[str, Tuple[Any, ...]]" = OrderedDict()
+_shape_intents_lock = threading.Lock()
+
+
+def _shape_intent(shape: str) -> Optional[Dict[str, Any]]:
+    """Return the cached routing fields for a query shape, if any"""
+    with _shape_intents_lock:
+        routing = _shape_intents.get(shape)
+        if routing is None:
+            return None
+        _shape_intents.move_to_end(shape)
+    intent = dict(zip(_ROUTING_KEYS, routing))
+    intent["requires_agents"] = list(intent["requires_agents"])
+    return intent
+
+
+def _remember_shape_intent(shape: str, intent_analysis: Any):
+    """
+    Cache the routing fields (only) of a complete GPT analysis.
+    
+    Analyses whose requires_agents is not a non-empty list of specialist
+    names are not cached, nor are fallback or error results.
+    """
+    if not isinstance(intent_analysis, dict) or "method" in intent_analysis or "error" in intent_analysis:
+        return
+    if not all(key in intent_analysis for key in _ROUTING_KEYS):
+        return
+    agents = intent_analysis["requires_agents"]
+    if not isinstance(agents, (list, tuple)) or not agents:
+        return
+    if not all(isinstance(agent, str) and agent in _SPECIALISTS for agent in agents):
+        return
+    routing = tuple(
+        tuple(intent_analysis[key]) if key == "requires_agents" else intent_analysis[key]
+        for key in _ROUTING_KEYS
+    )
+    with _shape_intents_lock:
+        _shape_intents[shape] = routing
+        _shape_intents.move_to_end(shape)
+        if len(_shape_intents) > SYSTEM_CONFIG["intent_cache_size"]:
+            _shape_intents.popitem(last=False)
+
+
+@functools.lru_cache(maxsize=SYSTEM_CONFIG["intent_cache_size"])
+def _gpt_intent(query: str) -> str:
+    """
+    Ask GPT for an intent analysis and return the raw JSON reply.
+    
+    The reply is streamed and the stream is closed as soon as all routing
+    keys have arrived, so the trailing reasoning does not add latency.
+    
+    Memoized on the query, so a repeated query costs no API round-trip.
+    Failed calls raise and are therefore never cached.
+    """
+    stream = client.chat.completions.create(
+        model="gpt-3.5-turbo",  # Cheap and fast
+        messages=[
+            {"role": "system", "content": _INTENT_INSTRUCTIONS},
+            {"role": "user", "content": f'Query: "{query}"'}
+        ],
+        temperature=0,  # Deterministic
+        response_format={"type": "json_object"},  # Always parseable JSON
+        stream=True
+    )
+    
+    parts: List[str] = []
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            
+            # A field can only have just ended on a separator
+            if "," in delta or "\n" in delta:
+                early = _complete_prefix("".join(parts))
+                if early is not None:
+                    return early
+    finally:
+        stream.close()
+    
+    # Handle a stream that produced no content
+    if not parts:
+        raise ValueError("Received no content from OpenAI API")
+    return "".join(parts)
+
+
+def _is_single_lookup(query_lower: str) -> bool:
+    """Whether a query is a plain lookup of one customer, with nothing for Support"""
+    return (
+        _FAST_PATH_ID_RE.search(query_lower) is not None
+        and not _SUPPORT_TERMS.match(query_lower)
+        and not support_hits(query_lower)
+    )
+
+
+@functools.lru_cache(maxsize=SYSTEM_CONFIG["intent_cache_size"])
+def _keyword_intents(query_lower: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Return the (intents, required agents) found by keyword matching"""
+    hits = _INTENT_KEYWORDS.match(query_lower)
+    matched = [(intent, agent_name) for intent, agent_name in _INTENT_AGENTS if intent in hits]
+    return (
+        tuple(intent for intent, _ in matched),
+        tuple(agent_name for _, agent_name in matched)
+    )
 
 class RouterAgent(BaseAgent):
     """
@@ -15,6 +220,8 @@ class RouterAgent(BaseAgent):
     It's the entry point for all customer queries.
     """
     
+    __slots__ = ("specialist_agents",)
+    
     def __init__(self, message_bus=None):
         """Initialize Router Agent with message bus"""
         super().__init__(ROUTER_AGENT_CONFIG, message_bus)
@@ -32,89 +239,117 @@ class RouterAgent(BaseAgent):
         Route a query to a specialist by SENDING A MESSAGE (true A2A).
         No direct function calls - only message passing!
         """
+        return self.route_to_specialists([(agent_name, query, context)])[0]
+    
+    def route_to_specialists(self, requests: List[Tuple[str, str, Optional[Dict]]]) -> List[Dict[str, Any]]:
+        """
+        Send several independent (agent_name, query, context) requests at
+        once, then wait for all replies.
         
-        if agent_name not in self.specialist_agents:
-            return {
-                "success": False,
-                "error": f"Unknown specialist agent: {agent_name}"
-            }
-        
-        # Send message to specialist
-        self.send_message(
-            to_agent=agent_name,
-            content=f"Please process: {query}",
-            data={"query": query, "context": context or {}}
-        )
-        
-        self.log_interaction("sent_message_to_specialist", {
-            "specialist": agent_name,
-            "query": query
-        })
-        
-        # Wait for response message
-        response_message = self.receive_message(timeout=5.0)
+        Each reply is matched to its request by correlation ID, so replies
+        may arrive in any order and a late reply is never mistaken for the
+        answer to a later request.
         
-        if response_message:
-            self.log_interaction("received_from_specialist", {
-                "specialist": response_message.from_agent,
-                "response_preview": str(response_message.data)[:200]
+        Each request gets 5 seconds per request queued before it at the
+        same specialist, plus its own 5, since a specialist handles its
+        messages one at a time.
+        """
+        started = time.monotonic()
+        queued: Dict[str, int] = {}
+        pending = []
+        for agent_name, query, context in requests:
+            if agent_name not in self.specialist_agents:
+                pending.append({
+                    "success": False,
+                    "error": f"Unknown specialist agent: {agent_name}"
+                })
+                continue
+            
+            # Send message to specialist
+            sent = self.request(
+                to_agent=agent_name,
+                content=f"Please process: {query}",
+                data={"query": query, "context": context or {}}
+            )
+            if sent is None:
+                pending.append({
+                    "success": False,
+                    "error": "No message bus available"
+                })
+                continue
+            queued[agent_name] = queued.get(agent_name, 0) + 1
+            pending.append(sent + (started + 5.0 * queued[agent_name],))
+            
+            self.log_interaction("sent_message_to_specialist", {
+                "specialist": agent_name,
+                "query": query
             })
+        
+        # Wait for the response messages
+        responses = []
+        for item in pending:
+            if isinstance(item, dict):
+                responses.append(item)
+                continue
             
-            return response_message.data
-        else:
-            return {
-                "success": False,
-                "error": "No response from specialist"
-            }
+            correlation_id, future, deadline = item
+            try:
+                response_message = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                self.message_bus.cancel_request(correlation_id)
+                responses.append({
+                    "success": False,
+                    "error": "No response from specialist"
+                })
+                continue
+            
+            if self.logging_enabled():
+                self.log_interaction("received_from_specialist", {
+                    "specialist": response_message.from_agent,
+                    "response_preview": str(response_message.data)[:200]
+                })
+            responses.append(response_message.data)
+        
+        return responses
     
     
-    def analyze_intent(self, query: str) -> Dict[str, Any]:
+    def analyze_intent(self, query: str, query_lower: Optional[str] = None) -> Dict[str, Any]:
         """
         Use OpenAI GPT to analyze user's query intent.
+        
+        query_lower is the already-lowercased query, if the caller has one.
+        Single-customer lookups are routed without GPT, and queries differing only in their numbers (IDs) reuse one analysis.
         """
+        if query_lower is None:
+            query_lower = query.lower()
         
-        prompt = f"""Analyze this customer service query and respond with JSON:
-
-    Query: "{query}"
-
-    Determine:
-    1. What agents are needed? (Customer Data Agent, Support Agent, or both)
-    2. What's the complexity? (simple, moderate, complex)
-    3. What's the primary intent?
-
-    Respond ONLY with valid JSON in this format:
-    {{
-        "primary_intent": "customer_data" | "customer_support" | "both",
-        "requires_agents": ["Customer Data Agent"] or ["Support Agent"] or ["Customer Data Agent", "Support Agent"],
-        "complexity": "simple" | "moderate" | "complex",
-        "reasoning": "brief explanation"
-    }}
-
-    Examples:
-    - "Get customer 5" → {{"primary_intent": "customer_data", "requires_agents": ["Customer Data Agent"], "complexity": "simple"}}
-    - "I need help, customer ID 5" → {{"primary_intent": "both", "requires_agents": ["Customer Data Agent", "Support Agent"], "complexity": "moderate"}}
-    """
+        # A lookup of one customer with no support terms needs only the
+        # Customer Data Agent; no point asking GPT
+        if _is_single_lookup(query_lower):
+            intent_analysis = {
+                "primary_intent": INTENT_CUSTOMER_DATA,
+                "requires_agents": [CUSTOMER_DATA_AGENT],
+                "complexity": "simple",
+                "original_query": query,
+                "method": "fast_path"
+            }
+            self.log_interaction("fast_path_intent", intent_analysis)
+            return intent_analysis
+        
+        # Same template as an earlier query: reuse its routing decision
+        shape = _DIGITS_RE.sub("#", query_lower)
+        intent_analysis = _shape_intent(shape)
+        if intent_analysis is not None:
+            intent_analysis["original_query"] = query
+            intent_analysis["llm_used"] = "gpt-3.5-turbo"
+            intent_analysis["cached"] = True
+            self.log_interaction("gpt_intent_cached", intent_analysis)
+            return intent_analysis
         
         try:
-            # Call OpenAI GPT
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",  # Cheap and fast
-                messages=[
-                    {"role": "system", "content": "You are a query analyzer. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0  # Deterministic
-            )
-            
-            # Parse JSON response
-            import json
-            
-            # Handle potential None for message content
-            message_content = response.choices[0].message.content
-            if message_content is None:
-                raise ValueError("Received None content from OpenAI API")
-
-            intent_analysis = json.loads(message_content.strip())
+            # Call OpenAI GPT (cached per query) and parse the JSON response
+            intent_analysis = json_loads(_gpt_intent(query))
+            _remember_shape_intent(shape, intent_analysis)
             
             # Add original query
             intent_analysis["original_query"] = query
@@ -126,26 +361,13 @@ class RouterAgent(BaseAgent):
         except Exception as e:
             # Fallback to keyword matching if GPT fails
             self.log_interaction("gpt_error", {"error": str(e), "using_fallback": True})
-            return self._fallback_keyword_analysis(query)
+            return self._fallback_keyword_analysis(query, query_lower)
 
-    def _fallback_keyword_analysis(self, query: str) -> Dict[str, Any]:
+    def _fallback_keyword_analysis(self, query: str, query_lower: Optional[str] = None) -> Dict[str, Any]:
         """Fallback to your original keyword matching if Gemini fails"""
-        query_lower = query.lower()
-        
-        intents = []
-        required_agents = []
-        keywords = []
-        
-        # Your original keyword logic here...
-        data_keywords = ["customer", "account", "information", "details", "id", "email", "phone"]
-        if any(keyword in query_lower for keyword in data_keywords):
-            intents.append("customer_data")
-            required_agents.append("Customer Data Agent")
-        
-        support_keywords = ["help", "issue", "problem", "support", "ticket", "cancel", "refund"]
-        if any(keyword in query_lower for keyword in support_keywords):
-            intents.append("customer_support")
-            required_agents.append("Support Agent")
+        if query_lower is None:
+            query_lower = query.lower()
+        intents, required_agents = _keyword_intents(query_lower)
         
         complexity = "simple"
         if len(required_agents) > 1:
@@ -153,7 +375,7 @@ class RouterAgent(BaseAgent):
         
         return {
             "primary_intent": intents[0] if intents else "unknown",
-            "requires_agents": list(set(required_agents)),
+            "requires_agents": list(required_agents),
             "complexity": complexity,
             "original_query": query,
             "method": "fallback_keywords"
@@ -171,13 +393,15 @@ class RouterAgent(BaseAgent):
         """
         return True
     
-    def process(self, query: str, context: Optional[Dict] = None) -> Dict[str, Any]:
+    def process(self, query: str, context: Optional[Dict] = None,
+                intent_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process a user query by analyzing intent and routing to specialists.
         
         Args:
             query: User's query
             context: Optional context (for multi-turn conversations)
+            intent_analysis: The query's analyze_intent() result, if already done
             
         Returns:
             Final response to user
@@ -185,7 +409,9 @@ class RouterAgent(BaseAgent):
         self.log_interaction("received_query", {"query": query})
         
         # Step 1: Analyze the intent
-        intent_analysis = self.analyze_intent(query)
+        query_lower = query.lower()
+        if intent_analysis is None:
+            intent_analysis = self.analyze_intent(query, query_lower)
         
         # Step 2: Determine routing strategy
         required_agents = intent_analysis["requires_agents"]
@@ -203,8 +429,8 @@ class RouterAgent(BaseAgent):
         
         # SCENARIO 1: TASK ALLOCATION (Simple or Moderate)
         # "Get customer info" OR "Help with account" (might need data first)
-        if complexity == "simple" or (primary_intent == "customer_support" and complexity == "moderate"):
-            return self._handle_task_allocation(query, intent_analysis)
+        if complexity == "simple" or (primary_intent == INTENT_CUSTOMER_SUPPORT and complexity == "moderate"):
+            return self._handle_task_allocation(query, intent_analysis, query_lower)
             
         # SCENARIO 2: NEGOTIATION (Complex - Multiple Intents)
         # "Cancel subscription + billing issues"
@@ -213,13 +439,14 @@ class RouterAgent(BaseAgent):
             
         # SCENARIO 3: MULTI-STEP (Complex - Batch/Aggregated)
         # "Status of ALL high-priority tickets..."
-        elif "all" in query.lower() or "list" in query.lower():
+        elif "all" in query_lower or "list" in query_lower:
              return self._handle_multi_step(query, intent_analysis)
              
         # Default fallback
-        return self._handle_task_allocation(query, intent_analysis)
+        return self._handle_task_allocation(query, intent_analysis, query_lower)
 
-    def _handle_task_allocation(self, query: str, intent: Dict) -> Dict[str, Any]:
+    def _handle_task_allocation(self, query: str, intent: Dict,
+                                query_lower: Optional[str] = None) -> Dict[str, Any]:
         """
         Handle simple task allocation.
         If support is needed, check if we need customer data first.
@@ -227,27 +454,29 @@ class RouterAgent(BaseAgent):
         required_agents = intent.get("requires_agents", [])
         
         # If it's just data, route to data agent
-        if "Customer Data Agent" in required_agents and "Support Agent" not in required_agents:
-            return self.route_to_specialist("Customer Data Agent", query)
+        if CUSTOMER_DATA_AGENT in required_agents and SUPPORT_AGENT not in required_agents:
+            return self.route_to_specialist(CUSTOMER_DATA_AGENT, query)
             
         # If it's support, we might need customer data first
-        if "Support Agent" in required_agents:
+        if SUPPORT_AGENT in required_agents:
             # Check if query implies we need to know WHO the customer is
             # (Simple heuristic: if it mentions "my account" or "customer ID", fetch data first)
-            needs_data = "id" in query.lower() or "customer" in query.lower()
+            if query_lower is None:
+                query_lower = query.lower()
+            needs_data = "id" in query_lower or "customer" in query_lower
             
             context = {}
             if needs_data:
                 # Step 1: Get Data
                 self.log_interaction("coordination_step", "Fetching customer data for support context")
-                data_response = self.route_to_specialist("Customer Data Agent", query)
+                data_response = self.route_to_specialist(CUSTOMER_DATA_AGENT, query)
                 
                 if data_response.get("success"):
                     context["customer"] = data_response.get("customer")
                     context["customer_id"] = data_response.get("customer", {}).get("id")
             
             # Step 2: Route to Support with context
-            return self.route_to_specialist("Support Agent", query, context)
+            return self.route_to_specialist(SUPPORT_AGENT, query, context)
             
         return {"success": False, "error": "Could not determine allocation"}
 
@@ -259,7 +488,7 @@ class RouterAgent(BaseAgent):
         self.log_interaction("coordination_start", "Starting Negotiation Flow")
         
         # Step 1: Ask Support Agent if they can handle it
-        support_response = self.route_to_specialist("Support Agent", query)
+        support_response = self.route_to_specialist(SUPPORT_AGENT, query)
         
         # Step 2: Check if Support Agent requested more info (Negotiation)
         if support_response.get("needs_context"):
@@ -269,14 +498,14 @@ class RouterAgent(BaseAgent):
             # Step 3: Ask Data Agent for the missing info
             # We construct a specific query for the data agent
             data_query = f"Get {missing_info} for customer {support_response.get('customer_id')}"
-            data_response = self.route_to_specialist("Customer Data Agent", data_query)
+            data_response = self.route_to_specialist(CUSTOMER_DATA_AGENT, data_query)
             
             # Step 4: Provide info back to Support Agent
             context = {
                 "negotiated_data": data_response, 
                 "customer_id": support_response.get("customer_id")
             }
-            final_response = self.route_to_specialist("Support Agent", query, context)
+            final_response = self.route_to_specialist(SUPPORT_AGENT, query, context)
             return final_response
             
         return support_response
@@ -291,28 +520,41 @@ class RouterAgent(BaseAgent):
         # (Assuming query is like "Status of tickets for all active customers")
         list_query = "List all active customers" # Simplified decomposition
         
-        data_response = self.route_to_specialist("Customer Data Agent", list_query)
+        data_response = self.route_to_specialist(CUSTOMER_DATA_AGENT, list_query)
         
         if not data_response.get("success"):
             return data_response
             
-        customers = data_response.get("customers", [])
-        results = []
-        
-        # Step 2: Iterate and process for each customer
         # (Limit to 3 for demo purposes to avoid timeout)
-        for customer in customers[:3]:
-            cid = customer['id']
-            cname = customer['name']
-            
-            # Step 3: Ask Support Agent for tickets for this customer
-            ticket_query = f"Get ticket status for customer {cid}"
-            support_response = self.route_to_specialist("Support Agent", ticket_query)
-            
-            results.append({
-                "customer": cname,
+        customers = data_response.get("customers", [])[:3]
+        
+        # Step 2: Fetch every customer's ticket history in one request
+        customer_ids = [customer['id'] for customer in customers]
+        history_response = self.route_to_specialist(
+            CUSTOMER_DATA_AGENT,
+            f"Get ticket history for customers {', '.join(map(str, customer_ids))}",
+            {"customer_ids": customer_ids}
+        )
+        histories = history_response.get("histories", {}) if history_response.get("success") else {}
+        
+        # Step 3: Ask Support Agent for tickets of every customer at once,
+        # handing over the history so it needs no lookup of its own
+        support_responses = self.route_to_specialists([
+            (
+                SUPPORT_AGENT,
+                f"Get ticket status for customer {customer['id']}",
+                {"negotiated_data": histories[customer['id']]} if customer['id'] in histories else None
+            )
+            for customer in customers
+        ])
+        
+        results = [
+            {
+                "customer": customer['name'],
                 "status": support_response.get("content")
-            })
+            }
+            for customer, support_response in zip(customers, support_responses)
+        ]
             
         # Step 4: Synthesize final answer
         summary = "\n".join([f"- {r['customer']}: {r['status']}" for r in results])
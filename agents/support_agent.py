@@ -3,9 +3,49 @@ Support Agent - Customer Service Specialist
 Handles support queries and ticket management.
 """
 
-from typing import Dict, Any, Optional
-from agents import BaseAgent
-from config.agent_config import SUPPORT_AGENT_CONFIG
+import functools
+import sys
+from typing import Dict, Any, Optional, FrozenSet
+from agents import BaseAgent, KeywordIndex, find_customer_id
+from config.agent_config import SUPPORT_AGENT_CONFIG, SYSTEM_CONFIG
+from mcp.mcp_client import MCPClient
+
+
+# Priority levels (interned, they are compared and stored on every request)
+PRIORITY_HIGH = sys.intern("high")
+PRIORITY_MEDIUM = sys.intern("medium")
+PRIORITY_LOW = sys.intern("low")
+
+# Support keywords by category, so a query is scanned once for all of them
+_SUPPORT_KEYWORDS = KeywordIndex({
+    # High priority indicators
+    PRIORITY_HIGH: ["urgent", "immediately", "asap", "critical",
+             "billing", "charged", "refund", "security",
+             "hack", "breach", "down", "outage"],
+    # Medium priority indicators
+    PRIORITY_MEDIUM: ["upgrade", "change", "modify", "request",
+               "feature", "improvement"],
+    # Ticket creation indicators
+    "ticket": ["issue", "problem", "error", "bug", "not working", "help", "charged"],
+    # Billing issues (negotiation scenario)
+    "billing": ["billing"]
+})
+
+
+@functools.lru_cache(maxsize=SYSTEM_CONFIG["intent_cache_size"])
+def support_hits(query_lower: str) -> FrozenSet[str]:
+    """Keyword categories found in a query (memoized for repeated queries)"""
+    return _SUPPORT_KEYWORDS.match(query_lower)
+
+
+def _priority_from_hits(hits: FrozenSet[str]) -> str:
+    """Map the keyword categories found in a query to a priority level"""
+    if PRIORITY_HIGH in hits:
+        return PRIORITY_HIGH
+    if PRIORITY_MEDIUM in hits:
+        return PRIORITY_MEDIUM
+    # Default to low priority
+    return PRIORITY_LOW
 
 
 class SupportAgent(BaseAgent):
@@ -13,6 +53,8 @@ class SupportAgent(BaseAgent):
     Specialist agent for customer support operations.
     """
     
+    __slots__ = ("mcp_client",)
+    
     def __init__(self):
         """Initialize Support Agent."""
         super().__init__(SUPPORT_AGENT_CONFIG)
@@ -34,25 +76,12 @@ class SupportAgent(BaseAgent):
         self.send_message(
             to_agent=message.from_agent,
             content="Support request processed",
-            data=result
+            data=result,
+            correlation_id=message.correlation_id
         )
         
         return result
     
-    def can_handle(self, query: str) -> bool:
-        """
-        Check if this agent can handle the query.
-        
-        Args:
-            query: User query
-            
-        Returns:
-            True if query relates to support/help
-        """
-        support_keywords = ["help", "issue", "problem", "support", "ticket", 
-                          "cancel", "refund", "billing", "error"]
-        return any(keyword in query.lower() for keyword in support_keywords)
-    
     def assess_priority(self, query: str) -> str:
         """
         Assess the priority level of a support issue.
@@ -63,23 +92,7 @@ class SupportAgent(BaseAgent):
         Returns:
             Priority level: 'high', 'medium', or 'low'
         """
-        query_lower = query.lower()
-        
-        # High priority indicators
-        high_priority_keywords = ["urgent", "immediately", "asap", "critical", 
-                                 "billing", "charged", "refund", "security", 
-                                 "hack", "breach", "down", "outage"]
-        if any(keyword in query_lower for keyword in high_priority_keywords):
-            return "high"
-        
-        # Medium priority indicators  
-        medium_priority_keywords = ["upgrade", "change", "modify", "request", 
-                                   "feature", "improvement"]
-        if any(keyword in query_lower for keyword in medium_priority_keywords):
-            return "medium"
-        
-        # Default to low priority
-        return "low"
+        return _priority_from_hits(support_hits(query.lower()))
     
     def process(self, query: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -87,32 +100,29 @@ class SupportAgent(BaseAgent):
         """
         self.log_interaction("processing_support_query", {"query": query})
 
-        # initialize MCP client
+        # initialize MCP client (lazily, on first use)
         if not self.mcp_client:
-            from mcp.mcp_client import MCPClient
             self.mcp_client = MCPClient()
         
+        # One keyword pass covers priority, ticket and billing checks
+        query_lower = query.lower()
+        hits = support_hits(query_lower)
+        
         # Assess priority
-        priority = self.assess_priority(query)
+        priority = _priority_from_hits(hits)
         self.log_interaction("priority_assessed", {"priority": priority})
 
         # extract customer ID if present
-        import re
-        customer_id = None
-        id_patterns = [r'id\s+(\d+)', r'customer\s+(\d+)', r'#(\d+)']
-        for pattern in id_patterns:
-            match = re.search(pattern, query.lower())
-            if match:
-                customer_id = int(match.group(1))
-                break
+        customer_id = find_customer_id(query_lower)
+        if customer_id is not None:
+            customer_id = int(customer_id)
         
         # Determine if ticket creation is needed
-        ticket_keywords = ["issue", "problem", "error", "bug", "not working", "help", "charged"]
-        needs_ticket = any(keyword in query.lower() for keyword in ticket_keywords)
+        needs_ticket = "ticket" in hits
 
         # Check for Negotiation Scenario (Billing issues)
         # If it's a billing issue and we don't have billing history context, ask for it
-        if "billing" in query.lower() and (not context or "negotiated_data" not in context):
+        if "billing" in hits and (not context or "negotiated_data" not in context):
              # Extract ID if possible
             if customer_id:
                 return {
@@ -166,7 +176,7 @@ class SupportAgent(BaseAgent):
                     tickets = history.get('tickets', [])
                     
                     # If this was a billing query (negotiation flow completed)
-                    if "billing" in query.lower():
+                    if "billing" in hits:
                          response["content"] = (
                             f"I've reviewed your billing history. You have {ticket_count} tickets. "
                             "I can see the billing discrepancy and have processed your cancellation."
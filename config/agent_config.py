@@ -8,6 +8,7 @@ Hyperparameters:
 - "system_instruction": System instruction for the agent
 - "capabilities": List of capabilities of the agent
 - "mcp_tools": List of tools this agent can call
+- "routing_keywords": Query keywords that this agent can handle
 """
 
 # Router Agent
@@ -57,9 +58,11 @@ Your responsibilities:
 
 You have access to these MCP tools:
 - get_customer(customer_id): Fetch customer details
+- get_customers_batch(customer_ids): Fetch several customers' details at once
 - list_customers(status, limit): List customers by status
 - update_customer(customer_id, data): Update customer information
 - get_customer_history(customer_id): Get customer's ticket history
+- get_customer_histories_batch(customer_ids): Get several customers' ticket histories at once
 
 Data validation rules:
 - Email must contain @ symbol
@@ -79,9 +82,16 @@ Always return structured data that other agents can use.""",
     # These are the MCP tools this agent can call
     "mcp_tools": [
         "get_customer",
+        "get_customers_batch",
         "list_customers", 
         "update_customer",
-        "get_customer_history"
+        "get_customer_history",
+        "get_customer_histories_batch"
+    ],
+    
+    "routing_keywords": [
+        "customer", "account", "information", "details", "id",
+        "email", "phone", "update", "get", "list"
     ]
 }
 
@@ -100,6 +110,7 @@ Your responsibilities:
 
 You have access to these MCP tools:
 - create_ticket(customer_id, issue, priority): Create support tickets
+- create_tickets(tickets): Create several support tickets at once
 - get_customer_history(customer_id): View past tickets
 
 Escalation rules:
@@ -118,7 +129,13 @@ Always be empathetic and solution-focused.""",
     
     "mcp_tools": [
         "create_ticket",
+        "create_tickets",
         "get_customer_history"
+    ],
+    
+    "routing_keywords": [
+        "help", "issue", "problem", "support", "ticket",
+        "cancel", "refund", "billing", "error"
     ]
 }
 
@@ -127,5 +144,9 @@ SYSTEM_CONFIG = {
     "max_coordination_steps": 10,  # Prevent infinite loops
     "response_timeout_seconds": 30,
     "enable_logging": True,
-    "log_level": "INFO"
+    "log_level": "INFO",
+    "interaction_history_limit": 1024,  # Per-agent debug history, oldest dropped first
+    "message_history_limit": 10000,  # Message bus history, oldest dropped first
+    "list_cache_ttl_seconds": 5,  # How long Customer Data Agent reuses a customer list
+    "intent_cache_size": 4096  # Distinct queries whose intent/priority analysis is memoized
 }
\ No newline at end of file
@@ -4,20 +4,38 @@ Uses message passing only.
 """
 
 from coordination.message_bus import MessageBus
-from typing import Dict, Any
-import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+import copy
+import threading
 
 class A2ACoordinator:
     """
     Coordinator for true Agent-to-Agent communication.
     """
     
-    def __init__(self, router_agent, data_agent, support_agent, verbose=True):
-        """Initialize coordinator with message bus"""
+    def __init__(self, router_agent, data_agent, support_agent, verbose=True, message_log_path=None,
+                 cache_size=0):
+        """
+        Initialize coordinator with message bus.
+        
+        message_log_path, if given, is a JSONL file every bus message is
+        appended to.
+        
+        cache_size is how many successful results to remember per
+        normalized query (0 disables the cache). Only enable it for
+        read-only workloads: a cache hit skips the agents entirely,
+        including side effects such as ticket creation.
+        """
         self.verbose = verbose
         
+        # Normalized query -> result, least recently used first
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_max = cache_size
+        
         # Create message bus
-        self.message_bus = MessageBus()
+        self.message_bus = MessageBus(verbose=verbose, history_path=message_log_path)
         
         # Set message bus for all agents
         router_agent.message_bus = self.message_bus
@@ -25,18 +43,35 @@ class A2ACoordinator:
         support_agent.message_bus = self.message_bus
         
         # Register all agents
-        self.message_bus.register_agent("Router Agent")
-        self.message_bus.register_agent("Customer Data Agent")
-        self.message_bus.register_agent("Support Agent")
+        self.message_bus.register_agent(router_agent.name)
+        self.message_bus.register_agent(data_agent.name)
+        self.message_bus.register_agent(support_agent.name)
         
         # Store agent references
         self.router = router_agent
         self.data_agent = data_agent
         self.support_agent = support_agent
         
+        # Specialists whose inboxes the message pump serves
+        self._pumped_agents = (
+            (data_agent.name, data_agent),
+            (support_agent.name, support_agent)
+        )
+        
+        # One worker thread per specialist: specialists run concurrently,
+        # while each one handles its messages one at a time, in arrival order
+        self._workers = {
+            agent_name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=agent_name)
+            for agent_name, _ in self._pumped_agents
+        }
+        
+        # Background message pump, started by the first query
+        self.running = False
+        self._pump_thread: Optional[threading.Thread] = None
+        
         # Register specialists with router (by name only)
-        self.router.specialist_agents["Customer Data Agent"] = "Customer Data Agent"
-        self.router.specialist_agents["Support Agent"] = "Support Agent"
+        self.router.specialist_agents[data_agent.name] = data_agent.name
+        self.router.specialist_agents[support_agent.name] = support_agent.name
         
         if verbose:
             print("\n✅ A2A Coordinator initialized")
@@ -47,32 +82,93 @@ class A2ACoordinator:
         """
         Background thread to process messages.
         Simulates agents running in parallel.
+        
+        Sleeps on the message bus until a specialist has mail, so a
+        message is picked up as soon as it is sent.
         """
+        agent_names = [agent_name for agent_name, _ in self._pumped_agents]
         while self.running:
-            agents_to_check = [
-                ("Customer Data Agent", self.data_agent),
-                ("Support Agent", self.support_agent)
-            ]
-            
-            for agent_name, agent in agents_to_check:
-                if self.message_bus.has_messages(agent_name):
-                    msg = self.message_bus.receive_message(agent_name)
-                    if msg:
-                        if self.verbose:
-                            print(f"   ⚙️ {agent_name} processing message...")
-                        
-                        # Agent processes message and sends reply
-                        # (This happens in the background thread)
-                        agent.process_message(msg)
+            for agent_name, agent in self._pumped_agents:
+                # Handle everything already queued for this agent in one pass
+                for msg in self.message_bus.drain(agent_name):
+                    if self.verbose:
+                        print(f"   ⚙️ {agent_name} processing message...")
+                    
+                    # Agent processes message and sends reply
+                    # (This happens on the agent's worker thread)
+                    future = self._workers[agent_name].submit(agent.process_message, msg)
+                    future.add_done_callback(self._report_failure)
             
-            time.sleep(0.1)
+            # Wait for the next message (or for the pump to be stopped)
+            self.message_bus.wait_for_messages(agent_names, until=lambda: not self.running)
+    
+    @staticmethod
+    def _report_failure(future):
+        """Surface errors raised while a specialist processed a message"""
+        error = future.exception()
+        if error is not None:
+            print(f"   ❌ Specialist failed to process message: {error!r}")
+    
+    def _start_pump(self):
+        """
+        Start the message pump unless it is already running.
+        
+        The pump stays up across queries (it costs nothing while idle);
+        messages are handed to the specialists' worker threads, which
+        process each specialist's messages in order.
+        """
+        if self._pump_thread is not None and self._pump_thread.is_alive():
+            return
+        self.running = True
+        self._pump_thread = threading.Thread(target=self._message_pump)
+        self._pump_thread.daemon = True
+        self._pump_thread.start()
+    
+    def close(self):
+        """Stop the background message pump and the specialist workers"""
+        self.running = False
+        self.message_bus.wake_waiters()
+        if self._pump_thread is not None:
+            self._pump_thread.join(timeout=1.0)
+            self._pump_thread = None
+        for worker in self._workers.values():
+            worker.shutdown(wait=True)
+        self.message_bus.close()
+
+    def process_queries(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process several queries, returning their results in order.
+        
+        The router's intent analyses (the LLM calls) for all queries run
+        concurrently up front; the queries then go through process_query
+        one by one with those analyses.
+        """
+        if not queries:
+            return []
+        
+        # (cached queries need no analysis)
+        uncached = [query for query in queries if self._normalize(query) not in self._cache]
+        analyses = {}
+        if uncached:
+            with ThreadPoolExecutor(max_workers=min(8, len(uncached))) as pool:
+                analyses = dict(zip(uncached, pool.map(self.router.analyze_intent, uncached)))
+        
+        return [self.process_query(query, analyses.get(query)) for query in queries]
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        """Cache key for a query: lowercased, whitespace collapsed"""
+        return " ".join(query.lower().split())
 
-    def process_query(self, query: str) -> Dict[str, Any]:
+    def process_query(self, query: str, intent_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process query using TRUE A2A message passing.
         
+        intent_analysis is the router's analysis of the query, if already
+        done (see process_queries).
+        
         Flow:
-        1. Start background message pump (to simulate other agents)
+        1. Start background message pump if needed (to simulate other agents)
         2. Router analyzes query and sends messages
         3. Message pump picks up messages and triggers specialists
         4. Specialists respond
@@ -84,21 +180,23 @@ class A2ACoordinator:
             print(f"PROCESSING QUERY: {query}")
             print(f"{'='*70}\n")
         
+        # Repeated query: reuse the earlier result
+        key = self._normalize(query) if self._cache_max else None
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            response = copy.deepcopy(self._cache[key])
+            response["query"] = query
+            response["messages"] = self.message_bus.get_message_history()
+            return response
+        
         # Start message pump
-        self.running = True
-        import threading
-        pump_thread = threading.Thread(target=self._message_pump)
-        pump_thread.daemon = True
-        pump_thread.start()
-        
-        try:
-            # Router processes query (blocks waiting for response)
-            result = self.router.process(query)
-            
-        finally:
-            # Stop pump
-            self.running = False
-            pump_thread.join(timeout=1.0)
+        self._start_pump()
+        
+        # Messages sent from here on belong to this query
+        first_message = self.message_bus.message_counter
+        
+        # Router processes query (blocks waiting for response)
+        result = self.router.process(query, intent_analysis=intent_analysis)
         
         # Get message history
         messages = self.message_bus.get_message_history()
@@ -107,12 +205,22 @@ class A2ACoordinator:
             print(f"\n{'='*70}")
             print("A2A MESSAGE HISTORY")
             print(f"{'='*70}")
-            for msg in messages:
+            for msg in self.message_bus.get_message_history(since=first_message):
                 print(f"  [{msg['from']} → {msg['to']}] {msg['content']}")
         
-        return {
+        response = {
             "query": query,
-            "final_response": result.get("content", str(result)),
+            # (only stringify the whole result when it has no content)
+            "final_response": result["content"] if "content" in result else str(result),
             "messages": messages,
             "success": result.get("success", True)
-        }
\ No newline at end of file
+        }
+        
+        # Remember successful results only (without the message history,
+        # which a cache hit takes fresh from the bus)
+        if key is not None and response["success"]:
+            self._cache[key] = copy.deepcopy({**response, "messages": []})
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+        
+        return response
\ No newline at end of file
@@ -3,13 +3,20 @@ Message Bus - True A2A Communication
 This enables agents to send/receive messages WITHOUT shared state.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable, Tuple, Callable, Deque
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from dataclasses import dataclass
-from datetime import datetime
 import queue
 import json
+import threading
+import time
+import uuid
 
-@dataclass
+from agents import ts_to_iso
+from config.agent_config import SYSTEM_CONFIG
+
+@dataclass(slots=True, frozen=True)
 class Message:
     """A message between agents"""
     id: str
@@ -17,11 +24,17 @@ class Message:
     to_agent: str
     content: str
     data: Optional[Dict] = None
-    timestamp: Optional[str] = None
+    timestamp: Optional[int] = None  # time.time_ns(), see iso_timestamp
+    correlation_id: Optional[str] = None  # Shared by a request and its reply
     
     def __post_init__(self):
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat()
+            object.__setattr__(self, "timestamp", time.time_ns())
+    
+    @property
+    def iso_timestamp(self) -> str:
+        """The send time as an ISO-8601 string"""
+        return ts_to_iso(self.timestamp)
     
     def to_dict(self):
         return {
@@ -30,7 +43,8 @@ class Message:
             "to": self.to_agent,
             "content": self.content,
             "data": self.data,
-            "timestamp": self.timestamp
+            "timestamp": self.iso_timestamp,
+            "correlation_id": self.correlation_id
         }
 
 
@@ -43,51 +57,141 @@ class MessageBus:
     No shared state - only message passing.
     """
     
-    def __init__(self):
+    def __init__(self, verbose: bool = True, history_path: Optional[str] = None):
+        # Print a trace line per registration, send and receive
+        self.verbose = verbose
+        
+        # Optional JSONL log of every message sent; message_history below
+        # only keeps the most recent ones in memory
+        self._history_file = open(history_path, "a", buffering=1 << 16) if history_path else None
+        
         # Each agent has its own inbox
         self.inboxes: Dict[str, queue.Queue] = {}
         
         # Message history for debugging
-        self.message_history: List[Message] = []
+        self.message_history: Deque[Message] = deque(
+            maxlen=SYSTEM_CONFIG["message_history_limit"]
+        )
         
         # Message ID counter
         self.message_counter = 0
+        
+        # Agents send from several threads; guards the counter and history
+        self._send_lock = threading.Lock()
+        
+        # Signalled whenever a message lands in an inbox
+        self._arrival = threading.Condition()
+        
+        # Outstanding requests: correlation ID -> (requesting agent, reply future)
+        self._pending: Dict[str, Tuple[str, Future]] = {}
+        # Recently cancelled requests: correlation ID -> requesting agent.
+        # Their late replies are dropped (nobody reads the requester's inbox
+        # for them); the oldest entries go once the limit is reached
+        self._cancelled: "OrderedDict[str, str]" = OrderedDict()
+        self._pending_lock = threading.Lock()
     
     def register_agent(self, agent_name: str):
         """Register an agent and create its inbox"""
         if agent_name not in self.inboxes:
             self.inboxes[agent_name] = queue.Queue()
-            print(f"📬 Registered agent inbox: {agent_name}")
+            if self.verbose:
+                print(f"📬 Registered agent inbox: {agent_name}")
     
-    def send_message(self, from_agent: str, to_agent: str, content: str, data: Optional[Dict] = None):
+    def send_message(self, from_agent: str, to_agent: str, content: str, data: Optional[Dict] = None,
+                     correlation_id: Optional[str] = None):
         """
         Send a message from one agent to another.
         This is TRUE message passing - no shared state!
+        
+        A message carrying the correlation ID of an outstanding request()
+        from the recipient resolves that request's future instead of
+        going to the recipient's inbox. A reply to a cancelled request is
+        dropped.
         """
         
         if to_agent not in self.inboxes:
             raise ValueError(f"Agent {to_agent} not registered")
         
-        # Create message
-        self.message_counter += 1
-        message = Message(
-            id=f"msg_{self.message_counter}",
-            from_agent=from_agent,
-            to_agent=to_agent,
-            content=content,
-            data=data
-        )
+        with self._send_lock:
+            # Create message
+            self.message_counter += 1
+            message = Message(
+                id=f"msg_{self.message_counter}",
+                from_agent=from_agent,
+                to_agent=to_agent,
+                content=content,
+                data=data,
+                correlation_id=correlation_id
+            )
+            
+            # Log for debugging
+            self.message_history.append(message)
+            if self._history_file is not None:
+                self._history_file.write(json.dumps(message.to_dict(), default=str) + "\n")
         
-        # Put message in recipient's inbox
-        self.inboxes[to_agent].put(message)
+        if self.verbose:
+            print(f"📨 [{from_agent} → {to_agent}] {content[:60]}...")
         
-        # Log for debugging
-        self.message_history.append(message)
+        # Hand replies straight to the waiting requester
+        reply_future = None
+        late_reply = False
+        if correlation_id is not None:
+            with self._pending_lock:
+                pending = self._pending.get(correlation_id)
+                if pending and pending[0] == to_agent:
+                    del self._pending[correlation_id]
+                    reply_future = pending[1]
+                elif self._cancelled.get(correlation_id) == to_agent:
+                    del self._cancelled[correlation_id]
+                    late_reply = True
         
-        print(f"📨 [{from_agent} → {to_agent}] {content[:60]}...")
+        if late_reply:
+            if self.verbose:
+                print(f"🗑️ [{to_agent}] Dropped late reply from {from_agent}")
+        elif reply_future is not None:
+            if self.verbose:
+                print(f"📬 [{to_agent}] Received message from {from_agent}")
+            reply_future.set_result(message)
+        else:
+            # Put message in recipient's inbox and wake anyone waiting for mail
+            self.inboxes[to_agent].put(message)
+            self.wake_waiters()
         
         return message.id
     
+    def request(self, from_agent: str, to_agent: str, content: str,
+                data: Optional[Dict] = None) -> Tuple[str, Future]:
+        """
+        Send a message that expects a reply.
+        
+        Returns the correlation ID and a future resolved with the reply
+        Message as soon as the recipient answers with that correlation ID.
+        Call cancel_request() if the requester stops waiting.
+        """
+        correlation_id = uuid.uuid4().hex
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending[correlation_id] = (from_agent, future)
+        
+        try:
+            self.send_message(from_agent, to_agent, content, data, correlation_id=correlation_id)
+        except Exception:
+            self.cancel_request(correlation_id)
+            raise
+        
+        return correlation_id, future
+    
+    def cancel_request(self, correlation_id: str):
+        """Stop waiting for a reply; a late reply is then dropped"""
+        with self._pending_lock:
+            pending = self._pending.pop(correlation_id, None)
+            if pending:
+                self._cancelled[correlation_id] = pending[0]
+                if len(self._cancelled) > SYSTEM_CONFIG["message_history_limit"]:
+                    self._cancelled.popitem(last=False)
+        if pending:
+            pending[1].cancel()
+    
     def receive_message(self, agent_name: str, timeout: float = 1.0) -> Optional[Message]:
         """
         Agent receives a message from its inbox.
@@ -99,18 +203,77 @@ class MessageBus:
         
         try:
             message = self.inboxes[agent_name].get(timeout=timeout)
-            print(f"📬 [{agent_name}] Received message from {message.from_agent}")
+            if self.verbose:
+                print(f"📬 [{agent_name}] Received message from {message.from_agent}")
             return message
         except queue.Empty:
             return None
     
+    def drain(self, agent_name: str, max_messages: int = 64) -> List[Message]:
+        """
+        Take every message already waiting in an agent's inbox (up to
+        max_messages) without blocking.
+        """
+        
+        if agent_name not in self.inboxes:
+            raise ValueError(f"Agent {agent_name} not registered")
+        
+        inbox = self.inboxes[agent_name]
+        messages = []
+        while len(messages) < max_messages:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if self.verbose:
+                print(f"📬 [{agent_name}] Received message from {message.from_agent}")
+            messages.append(message)
+        return messages
+    
     def has_messages(self, agent_name: str) -> bool:
         """Check if agent has pending messages"""
         return not self.inboxes[agent_name].empty()
     
-    def get_message_history(self) -> List[Dict]:
-        """Get all messages sent (for debugging)"""
-        return [msg.to_dict() for msg in self.message_history]
+    def wait_for_messages(self, agent_names: Iterable[str], until: Optional[Callable[[], bool]] = None,
+                          timeout: Optional[float] = None) -> bool:
+        """
+        Block until one of the agents has a pending message, until() returns
+        True, or the timeout expires. Returns the final predicate value.
+        """
+        agent_names = tuple(agent_names)
+        
+        def ready() -> bool:
+            return (until is not None and until()) or any(self.has_messages(name) for name in agent_names)
+        
+        with self._arrival:
+            return self._arrival.wait_for(ready, timeout)
+    
+    def wake_waiters(self):
+        """Wake every wait_for_messages() call so it re-checks its condition"""
+        with self._arrival:
+            self._arrival.notify_all()
+    
+    def get_message_history(self, since: int = 0) -> List[Dict]:
+        """
+        Get the messages sent (for debugging).
+        
+        Only the most recent SYSTEM_CONFIG["message_history_limit"] messages
+        are kept (the full record goes to history_path, if set). Pass since=<message_counter taken earlier> to get just the
+        messages sent after that point.
+        """
+        with self._send_lock:
+            newer = self.message_counter - since
+            history = list(self.message_history)
+        if newer < len(history):
+            history = history[len(history) - newer:] if newer > 0 else []
+        return [msg.to_dict() for msg in history]
+    
+    def close(self):
+        """Flush and close the message log, if there is one"""
+        with self._send_lock:
+            if self._history_file is not None:
+                self._history_file.close()
+                self._history_file = None
 
 
 class AgentMemory:
@@ -119,6 +282,8 @@ class AgentMemory:
     Each agent instance has its own AgentMemory.
     """
     
+    __slots__ = ("agent_name", "data", "conversation_history")
+    
     def __init__(self, agent_name: str):
         self.agent_name = agent_name
         self.data: Dict[str, Any] = {}
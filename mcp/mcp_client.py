@@ -1,10 +1,38 @@
 from mcp.mcp_server import MCPServer
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+import threading
+
+# One MCP server (and database connection) shared by every client in the
+# process; it is closed when the last client closes
+_server: Optional[MCPServer] = None
+_server_refs = 0
+_server_lock = threading.Lock()
+
+
+def _acquire_server() -> MCPServer:
+    """Return the shared server, starting it for the first client"""
+    global _server, _server_refs
+    with _server_lock:
+        if _server is None:
+            _server = MCPServer()
+        _server_refs += 1
+        return _server
+
+
+def _release_server():
+    """Drop one client's reference, closing the server after the last one"""
+    global _server, _server_refs
+    with _server_lock:
+        _server_refs -= 1
+        if _server_refs == 0 and _server is not None:
+            _server.close()
+            _server = None
+
 
 class MCPClient:
     def __init__(self):
         """ initialize connection to MCP server """
-        self.server = MCPServer()
+        self.server = _acquire_server()
         print(f"       [MCP Client] Connected to MCP server")
     
     def get_customer(self, customer_id: int) -> Dict[str, Any]:
@@ -23,10 +51,32 @@ class MCPClient:
         """Create a support ticket."""
         return self.server.create_ticket(customer_id, issue, priority)
     
+    def create_tickets(self, tickets: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create several support tickets in one transaction."""
+        return self.server.create_tickets(tickets)
+    
     def get_customer_history(self, customer_id: int) -> Dict[str, Any]:
         """Get customer's ticket history."""
         return self.server.get_customer_history(customer_id)
     
+    def get_customers_batch(self, customer_ids: List[int]) -> Dict[str, Any]:
+        """Get several customers at once."""
+        return self.server.get_customers_batch(customer_ids)
+    
+    def get_customer_histories_batch(self, customer_ids: List[int]) -> Dict[str, Any]:
+        """Get the ticket history of several customers at once."""
+        return self.server.get_customer_histories_batch(customer_ids)
+    
+    def batch_execute(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run several tool calls in one transaction."""
+        return self.server.batch_execute(calls)
+    
+    def batch(self):
+        """Context manager grouping several calls into one transaction."""
+        return self.server.batch()
+    
     def close(self):
         """Close MCP connection."""
-        self.server.close()
\ No newline at end of file
+        if self.server is not None:
+            self.server = None
+            _release_server()
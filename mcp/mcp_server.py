@@ -5,28 +5,151 @@ this server exposes database operations as MCP tools that agents can call
 This is the "API" that agents wll use to access the database
 """
 
+import contextlib
+import itertools
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import json
 
 DB_FILE = "customer_service.db"
 
+# Names of the MCP tools this server exposes
+TOOLS = (
+    'get_customer',
+    'list_customers',
+    'update_customer',
+    'create_ticket',
+    'get_customer_history',
+    'get_customer_histories_batch',
+    'get_customers_batch',
+    'create_tickets'
+)
+
+# Customer fields that update_customer may change (security!)
+UPDATABLE_FIELDS = ('name', 'email', 'phone', 'status')
+
+# Ticket priorities accepted by create_ticket
+VALID_PRIORITIES = frozenset({'low', 'medium', 'high'})
+
+# get_customer results are reused for this long, for at most this many
+# customers (update_customer drops the entry it changes)
+CUSTOMER_CACHE_TTL_SECONDS = 5.0
+CUSTOMER_CACHE_SIZE = 256
+
+# Applied to every connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64 MiB
+    "PRAGMA mmap_size=268435456"  # 256 MiB
+)
+
+# Indexes behind the per-customer ticket lookups (also covering their
+# newest-first order) and the status filter of list_customers
+INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_tickets_customer ON tickets (customer_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_status ON customers (status)"
+)
+
+# SQL of the tools. Kept as constants so every call passes the identical text
+# and sqlite3's per-connection statement cache reuses the compiled statement
+GET_CUSTOMER_SQL = """
+    SELECT id, name, email, phone, status, created_at, updated_at
+    FROM customers
+    WHERE id = ?
+"""
+
+LIST_CUSTOMERS_BY_STATUS_SQL = """
+    SELECT id, name, email, phone, status, created_at
+    FROM customers
+    WHERE status = ?
+    LIMIT ?
+"""
+
+LIST_CUSTOMERS_SQL = """
+    SELECT id, name, email, phone, status, created_at
+    FROM customers
+    LIMIT ?
+"""
+
+# Inserts nothing if the customer does not exist
+CREATE_TICKET_SQL = """
+    INSERT INTO tickets (customer_id, issue, status, priority, created_at)
+    SELECT ?, ?, 'open', ?, CURRENT_TIMESTAMP
+    WHERE EXISTS (SELECT 1 FROM customers WHERE id = ?)
+"""
+
+CUSTOMER_TICKETS_SQL = """
+    SELECT id, issue, status, priority, created_at
+    FROM tickets
+    WHERE customer_id = ?
+    ORDER BY created_at DESC
+"""
+
+
+def _update_customer_sql(fields: tuple) -> str:
+    """UPDATE statement setting the given customer fields (in order)"""
+    # Example: "UPDATE customers SET email = ?, phone = ? WHERE id = ?"
+    set_clause = ', '.join([f"{field} = ?" for field in fields])
+    return f"""
+        UPDATE customers 
+        SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """
+
+
+# UPDATE statement for every subset of UPDATABLE_FIELDS, keyed by the subset
+# in UPDATABLE_FIELDS order
+UPDATE_CUSTOMER_SQL = {
+    fields: _update_customer_sql(fields)
+    for size in range(1, len(UPDATABLE_FIELDS) + 1)
+    for fields in itertools.combinations(UPDATABLE_FIELDS, size)
+}
+
 class MCPServer:
     """ initialize MCP server """
     def __init__(self, db_file: str = DB_FILE):
         self.db_file = db_file
         self.connection: Optional[sqlite3.Connection] = None
+        self._cursor: Optional[sqlite3.Cursor] = None
+        
+        # One server may be shared by agents on different threads;
+        # statements on the connection run one at a time
+        self._lock = threading.RLock()
+        
+        # Nesting depth of batch() blocks; writes inside one share a commit
+        self._batch_depth = 0
+        self._batch_thread: Optional[int] = None  # thread running the batch
+        
+        # Recent customer rows: customer ID -> (expires_at, row), oldest first
+        self._customer_cache: "OrderedDict[int, tuple]" = OrderedDict()
         self._connect()
 
     def _connect(self):
         """ establish connection to database """
         try:
             # where we saved the connection to db
-            self.connection = sqlite3.connect(self.db_file) 
+            self.connection = sqlite3.connect(self.db_file, check_same_thread=False)
+
+            # one cursor for every statement (they all run under self._lock)
+            self._cursor = self.connection.cursor()
+
+            # WAL journal, one fsync per checkpoint instead of per commit, and
+            # a larger in-memory page cache (this is a demo database, not a ledger)
+            for pragma in CONNECTION_PRAGMAS:
+                self.connection.execute(pragma)
 
-            # makes rows behave like dictionaries (so, instead of `row[0]`, you can do `row['name']`)
-            self.connection.row_factory = sqlite3.Row 
+            # create missing indexes (skipped if the tables do not exist yet)
+            try:
+                for statement in INDEX_SQL:
+                    self.connection.execute(statement)
+            except sqlite3.OperationalError:
+                pass
             print(f"       [MCP Server] Connected to {self.db_file}")
         except Exception as e:
             print(f"       [MCP Server] Failed to connect to database: {e}")
@@ -37,34 +160,75 @@ class MCPServer:
         if not self.connection:
             raise RuntimeError("Database connection not established")
         
-        try:
-            cursor = self.connection.cursor()
+        # errors propagate to the tool method, which reports them
+        with self._lock:
+            cursor = self._cursor
             cursor.execute(query, params)
             rows = cursor.fetchall()
+            columns = [column[0] for column in cursor.description]
 
-            # convert row objects into dictionaries
-            return [dict(row) for row in rows]
-        except Exception as e:
-            print(f"Query error: {e}")
-            raise
+        # convert row tuples into dictionaries (so, instead of `row[0]`, you can do `row['name']`)
+        return [dict(zip(columns, row)) for row in rows]
     
     def _execute_update(self, query: str, params:tuple = ()) -> int:
         """ Execute an INSERT/UPDATE/DELETE query. """
         if not self.connection:
             raise RuntimeError("Database connection not established")
         
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            self.connection.commit()
-            
-            # For INSERT, return the new row's ID
-            # For UPDATE/DELETE, return number of affected rows
-            return cursor.lastrowid if cursor.lastrowid else cursor.rowcount
-        except Exception as e:
-            self.connection.rollback()  # Undo changes on error
-            print(f"Update error: {e}")
-            raise
+        with self._lock:
+            try:
+                cursor = self._cursor
+                cursor.execute(query, params)
+                if not self._batch_depth:
+                    self.connection.commit()
+                
+                # For INSERT, return the new row's ID (0 if nothing was inserted)
+                # For UPDATE/DELETE, return number of affected rows
+                # (lastrowid is the connection's last insert, so only trust it
+                # for an INSERT that inserted)
+                if cursor.rowcount > 0 and query.lstrip()[:6].upper() == "INSERT":
+                    return cursor.lastrowid
+                return cursor.rowcount
+            except Exception:
+                if not self._batch_depth:
+                    self.connection.rollback()  # Undo changes on error
+                raise  # reported by the tool method
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Group several tool calls into a single transaction.
+        
+        Writes inside the block are committed together (one fsync) when it
+        exits, or all rolled back if it raises. Inside the block, tool
+        methods raise database errors instead of returning them, so any
+        such error rolls back the whole batch (results such as an unknown
+        customer are not errors and are still returned). Other threads wait
+        until the block ends.
+        
+        Example:
+            >>> with server.batch():
+            ...     server.create_ticket(1, "Cannot login", "high")
+            ...     server.create_ticket(2, "Billing question", "low")
+        """
+        with self._lock:
+            self._batch_depth += 1
+            self._batch_thread = threading.get_ident()
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.connection.rollback()
+                    self._customer_cache.clear()  # may hold rolled-back rows
+                raise
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.connection.commit()
+
+    def _in_batch(self) -> bool:
+        """ whether the calling thread is inside a batch() block """
+        return self._batch_depth > 0 and self._batch_thread == threading.get_ident()
 
     # =========================================================================
     # MCP TOOL 1: get_customer
@@ -88,13 +252,23 @@ class MCPServer:
             }
         """
         try:
-            query = """
-                SELECT id, name, email, phone, status, created_at, updated_at
-                FROM customers
-                WHERE id = ?
-                """
-            
-            results = self._execute_query(query, (customer_id,))
+            with self._lock:
+                cached = self._customer_cache.get(customer_id)
+                if cached and cached[0] > time.monotonic():
+                    self._customer_cache.move_to_end(customer_id)
+                    return {
+                        'success': True,
+                        'customer': dict(cached[1])
+                    }
+                
+                results = self._execute_query(GET_CUSTOMER_SQL, (customer_id,))
+                if results:
+                    self._customer_cache[customer_id] = (
+                        time.monotonic() + CUSTOMER_CACHE_TTL_SECONDS, dict(results[0])
+                    )
+                    self._customer_cache.move_to_end(customer_id)
+                    if len(self._customer_cache) > CUSTOMER_CACHE_SIZE:
+                        self._customer_cache.popitem(last=False)
 
             if results:
                 return {
@@ -107,6 +281,8 @@ class MCPServer:
                     'error': f'Customer {customer_id} not found'
                 }
         except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
             return {
                 'success': False,
                 'error': f'Database error: {str(e)}'
@@ -141,19 +317,10 @@ class MCPServer:
         try:
             # Build query based on whether status filter is provided
             if status:
-                query = """
-                    SELECT id, name, email, phone, status, created_at
-                    FROM customers
-                    WHERE status = ?
-                    LIMIT ?
-                """
+                query = LIST_CUSTOMERS_BY_STATUS_SQL
                 params = (status, limit)
             else:
-                query = """
-                    SELECT id, name, email, phone, status, created_at
-                    FROM customers
-                    LIMIT ?
-                """
+                query = LIST_CUSTOMERS_SQL
                 params = (limit,)
             
             results = self._execute_query(query, params)
@@ -166,6 +333,8 @@ class MCPServer:
             }
             
         except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
             return {
                 'success': False,
                 'error': f'Database error: {str(e)}'
@@ -200,36 +369,27 @@ class MCPServer:
             }
         """
         try:
-            # Validate that customer exists
-            customer = self.get_customer(customer_id)
-            if not customer['success']:
-                return customer  # Return the error from get_customer
-            
-            # Only allow specific fields to be updated (security!)
-            allowed_fields = ['name', 'email', 'phone', 'status']
-            update_fields = {k: v for k, v in data.items() if k in allowed_fields}
+            # Only allow specific fields to be updated (security!),
+            # always in UPDATABLE_FIELDS order
+            update_fields = {k: data[k] for k in UPDATABLE_FIELDS if k in data}
             
             if not update_fields:
                 return {
                     'success': False,
                     'error': 'No valid fields to update',
-                    'allowed_fields': allowed_fields
+                    'allowed_fields': list(UPDATABLE_FIELDS)
                 }
             
-            # Build UPDATE query dynamically
-            # Example: "UPDATE customers SET email = ?, phone = ? WHERE id = ?"
-            set_clause = ', '.join([f"{field} = ?" for field in update_fields.keys()])
-            query = f"""
-                UPDATE customers 
-                SET {set_clause}, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """
+            # Look up the UPDATE query for this set of fields
+            query = UPDATE_CUSTOMER_SQL[tuple(update_fields)]
             
             # Build parameters tuple
             params = tuple(update_fields.values()) + (customer_id,)
             
-            # Execute update
-            rows_affected = self._execute_update(query, params)
+            # Execute update (no row affected means no such customer)
+            with self._lock:
+                self._customer_cache.pop(customer_id, None)
+                rows_affected = self._execute_update(query, params)
             
             if rows_affected > 0:
                 return {
@@ -241,10 +401,12 @@ class MCPServer:
             else:
                 return {
                     'success': False,
-                    'error': 'Update failed - no rows affected'
+                    'error': f'Customer {customer_id} not found'
                 }
                 
         except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
             return {
                 'success': False,
                 'error': f'Database error: {str(e)}'
@@ -277,43 +439,41 @@ class MCPServer:
             }
         """
         try:
-            # Validate customer exists
-            customer = self.get_customer(customer_id)
-            if not customer['success']:
-                return {
-                    'success': False,
-                    'error': f'Customer {customer_id} not found'
-                }
-            
-            # Validate priority
-            valid_priorities = ['low', 'medium', 'high']
-            if priority not in valid_priorities:
-                priority = 'medium'  # Default to medium if invalid
-            
-            # Insert ticket
-            query = """
-                INSERT INTO tickets (customer_id, issue, status, priority, created_at)
-                VALUES (?, ?, 'open', ?, CURRENT_TIMESTAMP)
-            """
-            
-            ticket_id = self._execute_update(query, (customer_id, issue, priority))
-            
-            return {
-                'success': True,
-                'ticket_id': ticket_id,
-                'customer_id': customer_id,
-                'issue': issue,
-                'priority': priority,
-                'status': 'open',
-                'message': f'Ticket #{ticket_id} created successfully'
-            }
-            
+            return self._insert_ticket(customer_id, issue, priority)
         except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
             return {
                 'success': False,
                 'error': f'Database error: {str(e)}'
             }
     
+    def _insert_ticket(self, customer_id: int, issue: str, priority: str) -> Dict[str, Any]:
+        """ create_ticket without the error handling (database errors raise). """
+        # Validate priority
+        if priority not in VALID_PRIORITIES:
+            priority = 'medium'  # Default to medium if invalid
+        
+        # Insert ticket (nothing is inserted for an unknown customer)
+        ticket_id = self._execute_update(
+            CREATE_TICKET_SQL, (customer_id, issue, priority, customer_id)
+        )
+        if not ticket_id:
+            return {
+                'success': False,
+                'error': f'Customer {customer_id} not found'
+            }
+        
+        return {
+            'success': True,
+            'ticket_id': ticket_id,
+            'customer_id': customer_id,
+            'issue': issue,
+            'priority': priority,
+            'status': 'open',
+            'message': f'Ticket #{ticket_id} created successfully'
+        }
+    
     # =========================================================================
     # MCP TOOL 5: get_customer_history
     # =========================================================================
@@ -346,14 +506,7 @@ class MCPServer:
                 return customer  # Return error
             
             # Get all tickets for this customer
-            query = """
-                SELECT id, issue, status, priority, created_at
-                FROM tickets
-                WHERE customer_id = ?
-                ORDER BY created_at DESC
-            """
-            
-            tickets = self._execute_query(query, (customer_id,))
+            tickets = self._execute_query(CUSTOMER_TICKETS_SQL, (customer_id,))
             
             return {
                 'success': True,
@@ -363,6 +516,210 @@ class MCPServer:
             }
             
         except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
+            return {
+                'success': False,
+                'error': f'Database error: {str(e)}'
+            }
+    
+    # =========================================================================
+    # MCP TOOL 6: get_customer_histories_batch
+    # =========================================================================
+    def get_customer_histories_batch(self, customer_ids: List[int]) -> Dict[str, Any]:
+        """
+        Get the ticket history of several customers at once.
+        
+        Same per-customer result as get_customer_history, but fetched with
+        two queries in total instead of two per customer.
+        
+        Args:
+            customer_ids: IDs of the customers
+            
+        Returns:
+            Histories keyed by customer ID
+            
+        Example:
+            >>> server.get_customer_histories_batch([1, 2])
+            {
+                'success': True,
+                'histories': {
+                    1: {'success': True, 'customer': {...}, 'ticket_count': 2, 'tickets': [...]},
+                    2: {'success': True, 'customer': {...}, 'ticket_count': 4, 'tickets': [...]}
+                }
+            }
+        """
+        try:
+            ids = list(dict.fromkeys(customer_ids))
+            if not ids:
+                return {'success': True, 'histories': {}}
+            placeholders = ', '.join('?' * len(ids))
+            
+            customers = self._execute_query(f"""
+                SELECT id, name, email, phone, status, created_at, updated_at
+                FROM customers
+                WHERE id IN ({placeholders})
+            """, tuple(ids))
+            
+            tickets = self._execute_query(f"""
+                SELECT customer_id, id, issue, status, priority, created_at
+                FROM tickets
+                WHERE customer_id IN ({placeholders})
+                ORDER BY created_at DESC
+            """, tuple(ids))
+            
+            # Group tickets by customer (keeps the created_at ordering)
+            tickets_by_customer: Dict[int, List[Dict]] = {}
+            for ticket in tickets:
+                tickets_by_customer.setdefault(ticket.pop('customer_id'), []).append(ticket)
+            
+            customers_by_id = {customer['id']: customer for customer in customers}
+            histories = {}
+            for customer_id in ids:
+                customer = customers_by_id.get(customer_id)
+                if customer is None:
+                    histories[customer_id] = {
+                        'success': False,
+                        'error': f'Customer {customer_id} not found'
+                    }
+                    continue
+                customer_tickets = tickets_by_customer.get(customer_id, [])
+                histories[customer_id] = {
+                    'success': True,
+                    'customer': customer,
+                    'ticket_count': len(customer_tickets),
+                    'tickets': customer_tickets
+                }
+            
+            return {
+                'success': True,
+                'histories': histories
+            }
+            
+        except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
+            return {
+                'success': False,
+                'error': f'Database error: {str(e)}'
+            }
+    
+    # =========================================================================
+    # MCP TOOL 7: get_customers_batch
+    # =========================================================================
+    def get_customers_batch(self, customer_ids: List[int]) -> Dict[str, Any]:
+        """
+        Retrieve several customers at once.
+        
+        Same per-customer result as get_customer, but fetched with a single
+        query instead of one per customer.
+        
+        Args:
+            customer_ids: IDs of the customers
+            
+        Returns:
+            get_customer results keyed by customer ID
+            
+        Example:
+            >>> server.get_customers_batch([5, 99])
+            {
+                'success': True,
+                'customers': {
+                    5: {'success': True, 'customer': {...}},
+                    99: {'success': False, 'error': 'Customer 99 not found'}
+                }
+            }
+        """
+        try:
+            ids = list(dict.fromkeys(customer_ids))
+            if not ids:
+                return {'success': True, 'customers': {}}
+            placeholders = ', '.join('?' * len(ids))
+            
+            rows = self._execute_query(f"""
+                SELECT id, name, email, phone, status, created_at, updated_at
+                FROM customers
+                WHERE id IN ({placeholders})
+            """, tuple(ids))
+            
+            customers_by_id = {row['id']: row for row in rows}
+            customers = {}
+            for customer_id in ids:
+                customer = customers_by_id.get(customer_id)
+                if customer is None:
+                    customers[customer_id] = {
+                        'success': False,
+                        'error': f'Customer {customer_id} not found'
+                    }
+                else:
+                    customers[customer_id] = {
+                        'success': True,
+                        'customer': customer
+                    }
+            
+            return {
+                'success': True,
+                'customers': customers
+            }
+            
+        except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
+            return {
+                'success': False,
+                'error': f'Database error: {str(e)}'
+            }
+    
+    # =========================================================================
+    # MCP TOOL 8: create_tickets
+    # =========================================================================
+    def create_tickets(self, tickets: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create several support tickets in one transaction.
+        
+        Each ticket is handled like a create_ticket call, but all of them are
+        committed together, so N tickets cost one commit instead of N.
+        A ticket for an unknown customer only fails its own entry; a
+        malformed entry or a database error rolls back the whole call.
+        
+        Args:
+            tickets: Dicts with 'customer_id', 'issue' and optionally 'priority'
+            
+        Returns:
+            One create_ticket result per ticket (same order)
+            
+        Example:
+            >>> server.create_tickets([
+            ...     {'customer_id': 1, 'issue': 'Cannot login', 'priority': 'high'},
+            ...     {'customer_id': 99, 'issue': 'Billing question'}
+            ... ])
+            {
+                'success': True,
+                'created': 1,
+                'tickets': [
+                    {'success': True, 'ticket_id': 7, 'customer_id': 1, ...},
+                    {'success': False, 'error': 'Customer 99 not found'}
+                ]
+            }
+        """
+        try:
+            with self.batch():
+                results = [
+                    self._insert_ticket(
+                        ticket['customer_id'], ticket['issue'], ticket.get('priority', 'medium')
+                    )
+                    for ticket in tickets
+                ]
+            
+            return {
+                'success': True,
+                'created': sum(1 for result in results if result['success']),
+                'tickets': results
+            }
+            
+        except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
             return {
                 'success': False,
                 'error': f'Database error: {str(e)}'
@@ -371,20 +728,65 @@ class MCPServer:
     # =========================================================================
     # Utility Methods
     # =========================================================================
-    def list_all_tools(self) -> List[str]:
+    def batch_execute(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several tool calls in one transaction, in order.
+        
+        Args:
+            calls: Dicts with 'tool' (a name from list_all_tools) and
+                optionally 'args' (keyword arguments for it)
+            
+        Returns:
+            One tool result per call (same order). An unknown tool or bad
+            arguments only fail their own call; a database error rolls back
+            every call, and each result then reports that error.
+            
+        Example:
+            >>> server.batch_execute([
+            ...     {'tool': 'get_customer', 'args': {'customer_id': 5}},
+            ...     {'tool': 'list_customers', 'args': {'status': 'active', 'limit': 3}}
+            ... ])
+            [{'success': True, 'customer': {...}}, {'success': True, 'count': 3, ...}]
+        """
+        results = []
+        try:
+            with self.batch():
+                for call in calls:
+                    tool = call.get('tool')
+                    if tool not in TOOLS:
+                        results.append({
+                            'success': False,
+                            'error': f'Unknown tool: {tool}'
+                        })
+                        continue
+                    try:
+                        results.append(getattr(self, tool)(**call.get('args', {})))
+                    except TypeError as e:
+                        results.append({
+                            'success': False,
+                            'error': f'Invalid arguments for {tool}: {str(e)}'
+                        })
+        except Exception as e:
+            if self._in_batch():
+                raise  # batch() rolls back
+            # every call was rolled back
+            return [
+                {
+                    'success': False,
+                    'error': f'Database error: {str(e)} (batch rolled back)'
+                }
+                for _ in calls
+            ]
+        return results
+    
+    def list_all_tools(self) -> Tuple[str, ...]:
         """
         List all available MCP tools.
         
         Returns:
-            List of tool names
+            Tuple of tool names
         """
-        return [
-            'get_customer',
-            'list_customers',
-            'update_customer',
-            'create_ticket',
-            'get_customer_history'
-        ]
+        return TOOLS
     
     def close(self):
         """Close database connection."""
@@ -17,6 +17,12 @@ def create_database():
         os.remove(DB_FILE)
         print(f"Old database deleted: {DB_FILE}")
 
+    # and any WAL files left by the MCP server, so they are not replayed
+    # into the new database
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(DB_FILE + suffix):
+            os.remove(DB_FILE + suffix)
+
     # connect to database (create file if it doesn't exist)
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
@@ -13,72 +13,104 @@ from mcp.mcp_client import MCPClient
 from agents.customer_data_agent import CustomerDataAgent
 from agents.support_agent import SupportAgent
 import json
+import os
 
+# TEST_QUIET=1 skips dumping every tool result (the checks still run)
+QUIET = os.environ.get("TEST_QUIET") == "1"
 
-def test_mcp_server_direct():
+# One encoder for every dump (same output as json.dumps(result, indent=2))
+_ENCODER = json.JSONEncoder(indent=2)
+
+
+def show(result):
+    """Pretty-print a tool or agent result, unless running quietly"""
+    if not QUIET:
+        print(_ENCODER.encode(result))
+
+
+def test_mcp_server_direct(server=None):
     """
     Test all 5 MCP tools directly (without agents).
     This verifies the database operations work correctly.
+    
+    The tool calls go to the server as one batch_execute call.
+    
+    Uses the given server, or opens (and closes) its own.
     """
     print("\n" + "="*70)
     print("TEST 1: DIRECT MCP SERVER TESTING")
     print("="*70)
     
-    server = MCPServer()
+    own_server = server is None
+    if own_server:
+        server = MCPServer()
+    
+    # All tools in one batched call (a single transaction), checked below
+    results = server.batch_execute([
+        {'tool': 'get_customer', 'args': {'customer_id': 5}},
+        {'tool': 'list_customers', 'args': {'status': 'active', 'limit': 3}},
+        {'tool': 'update_customer', 'args': {'customer_id': 5, 'data': {'email': 'eve.test@email.com'}}},
+        {'tool': 'get_customer', 'args': {'customer_id': 5}},
+        {'tool': 'create_ticket', 'args': {'customer_id': 1, 'issue': 'Test issue from Part 2', 'priority': 'high'}},
+        {'tool': 'get_customer_history', 'args': {'customer_id': 1}},
+        {'tool': 'no_such_tool'}
+    ])
+    customer, listing, update, updated, ticket, history, unknown = results
     
     # Tool 1: get_customer
     print("\n[1] Testing: get_customer(5)")
     print("-"*70)
-    result = server.get_customer(5)
-    print(json.dumps(result, indent=2))
-    assert result['success'], "get_customer should succeed"
-    assert result['customer']['name'] == "Eve Martinez", "Should get correct customer"
+    show(customer)
+    assert customer['success'], "get_customer should succeed"
+    assert customer['customer']['name'] == "Eve Martinez", "Should get correct customer"
     print("✓ get_customer works!")
     
     # Tool 2: list_customers
     print("\n[2] Testing: list_customers(status='active', limit=3)")
     print("-"*70)
-    result = server.list_customers(status='active', limit=3)
-    print(json.dumps(result, indent=2))
-    assert result['success'], "list_customers should succeed"
-    assert result['count'] <= 3, "Should respect limit"
-    print(f"✓ list_customers works! Found {result['count']} customers")
+    show(listing)
+    assert listing['success'], "list_customers should succeed"
+    assert listing['count'] <= 3, "Should respect limit"
+    print(f"✓ list_customers works! Found {listing['count']} customers")
     
     # Tool 3: update_customer
     print("\n[3] Testing: update_customer(5, {'email': 'eve.test@email.com'})")
     print("-"*70)
-    result = server.update_customer(5, {'email': 'eve.test@email.com'})
-    print(json.dumps(result, indent=2))
-    assert result['success'], "update_customer should succeed"
-    assert 'email' in result['updated_fields'], "Should update email"
+    show(update)
+    assert update['success'], "update_customer should succeed"
+    assert 'email' in update['updated_fields'], "Should update email"
     print("✓ update_customer works!")
     
     # Verify the update
     print("\n   Verifying update...")
-    result = server.get_customer(5)
-    assert result['customer']['email'] == 'eve.test@email.com', "Email should be updated"
+    assert updated['customer']['email'] == 'eve.test@email.com', "Email should be updated"
     print("   ✓ Update verified!")
     
     # Tool 4: create_ticket
     print("\n[4] Testing: create_ticket(1, 'Test issue from Part 2', 'high')")
     print("-"*70)
-    result = server.create_ticket(1, 'Test issue from Part 2', 'high')
-    print(json.dumps(result, indent=2))
-    assert result['success'], "create_ticket should succeed"
-    assert result['priority'] == 'high', "Should set correct priority"
-    ticket_id = result['ticket_id']
-    print(f"✓ create_ticket works! Created ticket #{ticket_id}")
+    show(ticket)
+    assert ticket['success'], "create_ticket should succeed"
+    assert ticket['priority'] == 'high', "Should set correct priority"
+    print(f"✓ create_ticket works! Created ticket #{ticket['ticket_id']}")
     
     # Tool 5: get_customer_history
     print("\n[5] Testing: get_customer_history(1)")
     print("-"*70)
-    result = server.get_customer_history(1)
-    print(json.dumps(result, indent=2))
-    assert result['success'], "get_customer_history should succeed"
-    assert result['ticket_count'] > 0, "Customer 1 should have tickets"
-    print(f"✓ get_customer_history works! Found {result['ticket_count']} tickets")
+    show(history)
+    assert history['success'], "get_customer_history should succeed"
+    assert history['ticket_count'] > 0, "Customer 1 should have tickets"
+    print(f"✓ get_customer_history works! Found {history['ticket_count']} tickets")
     
-    server.close()
+    # Unknown tools are rejected without failing the batch
+    print("\n[6] Testing: batch_execute with an unknown tool")
+    print("-"*70)
+    show(unknown)
+    assert not unknown['success'], "Should reject unknown tools"
+    print("✓ batch_execute works!")
+    
+    if own_server:
+        server.close()
     
     print("\n" + "="*70)
     print("ALL MCP SERVER TOOLS PASSED ✓")
@@ -98,19 +130,19 @@ def test_mcp_client():
     
     print("\n[1] Client: get_customer(3)")
     result = client.get_customer(3)
-    print(json.dumps(result, indent=2))
+    show(result)
     assert result['success'], "Client should successfully get customer"
     print("✓ Client get_customer works!")
     
     print("\n[2] Client: list_customers(status='active')")
     result = client.list_customers(status='active', limit=5)
-    print(json.dumps(result, indent=2))
+    show(result)
     assert result['success'], "Client should successfully list customers"
     print("✓ Client list_customers works!")
     
     print("\n[3] Client: create_ticket(2, 'Client test ticket', 'medium')")
     result = client.create_ticket(2, 'Client test ticket', 'medium')
-    print(json.dumps(result, indent=2))
+    show(result)
     assert result['success'], "Client should successfully create ticket"
     print("✓ Client create_ticket works!")
     
@@ -138,7 +170,7 @@ def test_agent_mcp_integration():
     print("\n[1] Data Agent: Get customer 5")
     print("-"*70)
     result = data_agent.process("Get customer information for ID 5")
-    print(json.dumps(result, indent=2))
+    show(result)
     assert result['success'], "Data agent should retrieve customer"
     assert 'customer' in result, "Should return customer data"
     print(f"✓ Data Agent retrieved: {result['customer']['name']}")
@@ -147,7 +179,7 @@ def test_agent_mcp_integration():
     print("\n[2] Data Agent: List all active customers")
     print("-"*70)
     result = data_agent.process("List all active customers")
-    print(json.dumps(result, indent=2))
+    show(result)
     assert result['success'], "Data agent should list customers"
     assert 'customers' in result, "Should return customers list"
     print(f"✓ Data Agent listed {len(result['customers'])} customers")
@@ -156,7 +188,7 @@ def test_agent_mcp_integration():
     print("\n[3] Data Agent: Update customer email")
     print("-"*70)
     result = data_agent.process("Update customer 5 email to newemail@example.com")
-    print(json.dumps(result, indent=2))
+    show(result)
     assert result['success'], "Data agent should update customer"
     print("✓ Data Agent updated customer email")
     
@@ -164,7 +196,7 @@ def test_agent_mcp_integration():
     print("\n[4] Support Agent: Create support ticket")
     print("-"*70)
     result = support_agent.process("I'm customer 3 and I need help with billing")
-    print(json.dumps(result, indent=2))
+    show(result)
     # Support agent should create a ticket
     print("✓ Support Agent processed request")
     
@@ -172,7 +204,7 @@ def test_agent_mcp_integration():
     print("\n[5] Support Agent: Check customer history")
     print("-"*70)
     result = support_agent.process("Show history for customer 1")
-    print(json.dumps(result, indent=2))
+    show(result)
     print("✓ Support Agent retrieved history")
     
     print("\n" + "="*70)
@@ -180,21 +212,25 @@ def test_agent_mcp_integration():
     print("="*70)
 
 
-def test_error_handling():
+def test_error_handling(server=None):
     """
     Test error cases to ensure robust error handling.
+    
+    Uses the given server, or opens (and closes) its own.
     """
     print("\n" + "="*70)
     print("TEST 4: ERROR HANDLING")
     print("="*70)
     
-    server = MCPServer()
+    own_server = server is None
+    if own_server:
+        server = MCPServer()
     
     # Test 1: Invalid customer ID
     print("\n[1] Testing: get_customer(999) - Non-existent customer")
     print("-"*70)
     result = server.get_customer(999)
-    print(json.dumps(result, indent=2))
+    show(result)
     assert not result['success'], "Should fail for non-existent customer"
     assert 'error' in result, "Should return error message"
     print("✓ Correctly handles non-existent customer")
@@ -203,7 +239,7 @@ def test_error_handling():
     print("\n[2] Testing: list_customers(status='invalid')")
     print("-"*70)
     result = server.list_customers(status='invalid', limit=10)
-    print(json.dumps(result, indent=2))
+    show(result)
     # Should succeed but return empty list
     assert result['success'], "Should handle invalid status gracefully"
     print("✓ Correctly handles invalid status filter")
@@ -212,7 +248,7 @@ def test_error_handling():
     print("\n[3] Testing: update_customer(999, {'email': 'test@test.com'})")
     print("-"*70)
     result = server.update_customer(999, {'email': 'test@test.com'})
-    print(json.dumps(result, indent=2))
+    show(result)
     assert not result['success'], "Should fail for non-existent customer"
     print("✓ Correctly handles update to non-existent customer")
     
@@ -220,11 +256,12 @@ def test_error_handling():
     print("\n[4] Testing: create_ticket(999, 'Issue', 'high')")
     print("-"*70)
     result = server.create_ticket(999, 'Test issue', 'high')
-    print(json.dumps(result, indent=2))
+    show(result)
     assert not result['success'], "Should fail for non-existent customer"
     print("✓ Correctly handles ticket for non-existent customer")
     
-    server.close()
+    if own_server:
+        server.close()
     
     print("\n" + "="*70)
     print("ERROR HANDLING TESTS PASSED ✓")
@@ -255,7 +292,8 @@ def test_agent_queries():
         print("-"*70)
         result = agent.process(query)
         print(f"Success: {result.get('success', 'N/A')}")
-        print(f"Response: {result.get('content', str(result))[:150]}...")
+        response = result['content'] if 'content' in result else str(result)
+        print(f"Response: {response[:150]}...")
         print("✓")
     
     print("\n" + "="*70)
@@ -275,9 +313,12 @@ def main():
     print("\n[SETUP] Make sure you've run setup_database.py first!")
     print("This will test the 5 MCP tools and agent integration.\n")
     
+    # One database connection for the direct server tests
+    server = MCPServer()
+    
     try:
         # Test 1: Direct MCP server
-        test_mcp_server_direct()
+        test_mcp_server_direct(server)
         
         # Test 2: MCP client wrapper
         test_mcp_client()
@@ -286,7 +327,7 @@ def main():
         test_agent_mcp_integration()
         
         # Test 4: Error handling
-        test_error_handling()
+        test_error_handling(server)
         
         # Test 5: Realistic queries
         test_agent_queries()
@@ -323,6 +364,8 @@ def main():
     except Exception as e:
         print(f"\n❌ UNEXPECTED ERROR: {e}")
         print("Make sure setup_database.py has been run successfully.")
+    finally:
+        server.close()
 
 
 if __name__ == "__main__":
@@ -7,63 +7,101 @@ from agents.router_agent import RouterAgent
 from agents.customer_data_agent import CustomerDataAgent
 from agents.support_agent import SupportAgent
 from coordination.a2a_coordinator import A2ACoordinator
-import time
+from collections import Counter
+import os
 
-def test_scenario_1_task_allocation(coordinator):
+# TEST_QUIET=1 skips listing every message of a scenario (the checks still run)
+QUIET = os.environ.get("TEST_QUIET") == "1"
+
+SCENARIO_1_QUERY = "I need help with my account, customer ID 1"
+SCENARIO_2_QUERY = "I want to cancel my subscription but I'm having billing issues, customer ID 1"
+SCENARIO_3_QUERY = "What's the status of tickets for all active customers?"
+
+def make_coordinator():
+    """Create the agents and an A2A coordinator for them"""
+    router = RouterAgent()
+    data_agent = CustomerDataAgent()
+    support_agent = SupportAgent()
+    return A2ACoordinator(router, data_agent, support_agent, verbose=False) # Less verbose for cleaner output
+
+def _process(coordinator, query):
+    """Run one scenario query, on a system of its own if no coordinator is given"""
+    if coordinator is not None:
+        return coordinator.process_query(query)
+    coordinator = make_coordinator()
+    try:
+        return coordinator.process_query(query)
+    finally:
+        coordinator.close()
+
+def _print_flow(messages):
+    """List the messages exchanged, unless running quietly"""
+    print(f"\nMessage Flow ({len(messages)} messages):")
+    if QUIET or not messages:
+        return
+    # One write for the whole listing
+    print("\n".join(
+        f"  [{msg['from']} -> {msg['to']}] {msg['content'][:50]}..." for msg in messages
+    ))
+
+def _tally(messages):
+    """Count the messages sent to each agent, in one pass"""
+    return Counter(m['to'] for m in messages)
+
+def test_scenario_1_task_allocation(coordinator=None):
     """
     Scenario 1: Task Allocation
     Query: "I need help with my account, customer ID 1"
     Flow: Router -> Data (get info) -> Support (handle request with context)
     """
+    verify_scenario_1_task_allocation(_process(coordinator, SCENARIO_1_QUERY))
+
+def verify_scenario_1_task_allocation(result):
+    """Report and check the result of the Scenario 1 query"""
     print("\n" + "="*70)
     print("SCENARIO 1: TASK ALLOCATION")
     print("Query: 'I need help with my account, customer ID 1'")
     print("Expected: Router fetches data first, then passes to Support")
     print("="*70)
     
-    query = "I need help with my account, customer ID 1"
-    result = coordinator.process_query(query)
-    
     print(f"\nFinal Response: {result['final_response']}")
     
     # Verify flow
     messages = result['messages']
-    print(f"\nMessage Flow ({len(messages)} messages):")
-    for msg in messages:
-        print(f"  [{msg['from']} -> {msg['to']}] {msg['content'][:50]}...")
-        
+    _print_flow(messages)
+    
     # Check if Data Agent was involved
-    has_data_call = any(m['to'] == 'Customer Data Agent' for m in messages)
-    has_support_call = any(m['to'] == 'Support Agent' for m in messages)
+    to_counts = _tally(messages)
+    has_data_call = to_counts['Customer Data Agent'] > 0
+    has_support_call = to_counts['Support Agent'] > 0
     
     if has_data_call and has_support_call:
         print("\n✅ Scenario 1 PASSED: Coordinated Data -> Support")
     else:
         print("\n❌ Scenario 1 FAILED: Missing agent coordination")
 
-def test_scenario_2_negotiation(coordinator):
+def test_scenario_2_negotiation(coordinator=None):
     """
     Scenario 2: Negotiation
     Query: "I want to cancel my subscription but I'm having billing issues, customer ID 1"
     Flow: Router -> Support (needs context) -> Router -> Data (get history) -> Router -> Support (final)
     """
+    verify_scenario_2_negotiation(_process(coordinator, SCENARIO_2_QUERY))
+
+def verify_scenario_2_negotiation(result):
+    """Report and check the result of the Scenario 2 query"""
     print("\n" + "="*70)
     print("SCENARIO 2: NEGOTIATION")
     print("Query: 'I want to cancel my subscription but I'm having billing issues, customer ID 1'")
     print("Expected: Support asks for billing info, Router fetches it, then Support finishes")
     print("="*70)
     
-    query = "I want to cancel my subscription but I'm having billing issues, customer ID 1"
-    result = coordinator.process_query(query)
-    
     print(f"\nFinal Response: {result['final_response']}")
     
     # Verify flow
     messages = result['messages']
-    print(f"\nMessage Flow ({len(messages)} messages):")
-    for msg in messages:
-        print(f"  [{msg['from']} -> {msg['to']}] {msg['content'][:50]}...")
-        
+    _print_flow(messages)
+    
     # Check for negotiation pattern
     # 1. Router -> Support
     # 2. Support -> Router (I need context)
@@ -76,35 +114,33 @@ def test_scenario_2_negotiation(coordinator):
     else:
          print("\n❌ Scenario 2 FAILED: Flow too short for negotiation")
 
-def test_scenario_3_multi_step(coordinator):
+def test_scenario_3_multi_step(coordinator=None):
     """
     Scenario 3: Multi-Step Coordination
     Query: "What's the status of tickets for all active customers?"
     Flow: Router -> Data (list) -> [Loop] Router -> Support (get tickets) -> Router (Synthesize)
     """
+    verify_scenario_3_multi_step(_process(coordinator, SCENARIO_3_QUERY))
+
+def verify_scenario_3_multi_step(result):
+    """Report and check the result of the Scenario 3 query"""
     print("\n" + "="*70)
     print("SCENARIO 3: MULTI-STEP COORDINATION")
     print("Query: 'What's the status of tickets for all active customers?'")
     print("Expected: Router lists customers, then checks tickets for each")
     print("="*70)
     
-    query = "What's the status of tickets for all active customers?"
-    result = coordinator.process_query(query)
-    
     print(f"\nFinal Response:\n{result['final_response']}")
     
     # Verify flow
     messages = result['messages']
-    print(f"\nMessage Flow ({len(messages)} messages):")
-    for msg in messages:
-        # Only show the first few to avoid spam
-        print(f"  [{msg['from']} -> {msg['to']}] {msg['content'][:50]}...")
-        
+    _print_flow(messages)
+    
     # Check if we have multiple calls to Support (one per customer)
-    support_calls = [m for m in messages if m['to'] == 'Support Agent']
-    print(f"\nSupport calls made: {len(support_calls)}")
+    support_calls = _tally(messages)['Support Agent']
+    print(f"\nSupport calls made: {support_calls}")
     
-    if len(support_calls) >= 2: # We limit to 3 in the code, so should be at least 2
+    if support_calls >= 2: # We limit to 3 in the code, so should be at least 2
         print("\n✅ Scenario 3 PASSED: Multi-step iteration detected")
     else:
         print("\n❌ Scenario 3 FAILED: Did not iterate through customers")
@@ -112,20 +148,15 @@ def test_scenario_3_multi_step(coordinator):
 def main():
     print("INITIALIZING SYSTEM FOR PART 3 TESTS...")
     
-    # Initialize agents
-    router = RouterAgent()
-    data_agent = CustomerDataAgent()
-    support_agent = SupportAgent()
-    
-    # Initialize Coordinator
-    coordinator = A2ACoordinator(router, data_agent, support_agent, verbose=False) # Less verbose for cleaner output
+    # Initialize agents and coordinator
+    coordinator = make_coordinator()
     
-    # Run Scenarios
-    test_scenario_1_task_allocation(coordinator)
-    time.sleep(1)
-    test_scenario_2_negotiation(coordinator)
-    time.sleep(1)
-    test_scenario_3_multi_step(coordinator)
+    # Run the scenario queries as one batch (their intent analyses overlap),
+    # then check each result
+    results = coordinator.process_queries([SCENARIO_1_QUERY, SCENARIO_2_QUERY, SCENARIO_3_QUERY])
+    verify_scenario_1_task_allocation(results[0])
+    verify_scenario_2_negotiation(results[1])
+    verify_scenario_3_multi_step(results[2])
     
     print("\n" + "="*70)
     print("PART 3 TESTS COMPLETE")
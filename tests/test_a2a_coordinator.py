@@ -0,0 +1,69 @@
+"""
+Tests for A2ACoordinator's per-query result cache, with stand-in agents.
+"""
+
+import unittest
+
+from coordination.a2a_coordinator import A2ACoordinator
+
+
+class _Agent:
+    """Just enough of an agent for the coordinator to register it"""
+
+    def __init__(self, name):
+        self.name = name
+        self.message_bus = None
+
+    def process_message(self, message):
+        pass
+
+
+class _Router(_Agent):
+    """Counts the queries it is asked to process"""
+
+    def __init__(self):
+        super().__init__("Router Agent")
+        self.specialist_agents = {}
+        self.processed = []
+
+    def analyze_intent(self, query):
+        return {"requires_agents": []}
+
+    def process(self, query, intent_analysis=None):
+        self.processed.append(query)
+        return {"success": True, "content": f"answer to {query}"}
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def make_coordinator(self, cache_size):
+        self.router = _Router()
+        coordinator = A2ACoordinator(
+            self.router, _Agent("Customer Data Agent"), _Agent("Support Agent"),
+            verbose=False, cache_size=cache_size
+        )
+        self.addCleanup(coordinator.close)
+        return coordinator
+
+    def test_repeated_query_skips_router(self):
+        coordinator = self.make_coordinator(cache_size=8)
+        first = coordinator.process_query("Get customer 5")
+        second = coordinator.process_query("  get   CUSTOMER 5 ")
+        self.assertEqual(self.router.processed, ["Get customer 5"])
+        self.assertEqual(second["final_response"], first["final_response"])
+        self.assertEqual(second["query"], "  get   CUSTOMER 5 ")
+
+    def test_cache_off_by_default(self):
+        coordinator = self.make_coordinator(cache_size=0)
+        coordinator.process_query("Get customer 5")
+        coordinator.process_query("Get customer 5")
+        self.assertEqual(len(self.router.processed), 2)
+
+    def test_oldest_entry_evicted(self):
+        coordinator = self.make_coordinator(cache_size=1)
+        coordinator.process_queries(["a", "b", "a"])
+        self.assertEqual(self.router.processed, ["a", "b", "a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Tests for KeywordIndex, which must match like a plain
+`any(keyword in text for keyword in keywords)` per tag.
+"""
+
+import unittest
+
+from agents import KeywordIndex
+
+
+TABLE = {
+    "help": ["help"],
+    "helpful": ["helpful"],
+    "broken": ["not working", "work"],
+    "negation": ["not"],
+    "billing": ["bill", "billing", "charged"]
+}
+
+TEXTS = [
+    "",
+    "i need help",
+    "that was helpful",
+    "unhelpful answer",
+    "my login is not working",
+    "homework",
+    "i was charged twice on my billing statement",
+    "nothing to see",
+    "help, not working and billing"
+]
+
+
+def expected_tags(text):
+    """The tags the plain any() scan finds"""
+    return frozenset(
+        tag for tag, keywords in TABLE.items()
+        if any(keyword in text for keyword in keywords)
+    )
+
+
+class KeywordIndexTest(unittest.TestCase):
+
+    def test_matches_any_semantics(self):
+        index = KeywordIndex(TABLE)
+        for text in TEXTS:
+            with self.subTest(text=text):
+                self.assertEqual(index.match(text), expected_tags(text))
+
+    def test_prefix_keywords_both_match(self):
+        index = KeywordIndex(TABLE)
+        self.assertEqual(index.match("helpful"), {"help", "helpful"})
+        self.assertEqual(index.match("help"), {"help"})
+
+    def test_overlapping_keywords(self):
+        index = KeywordIndex(TABLE)
+        self.assertEqual(index.match("not working"), {"broken", "negation"})
+
+    def test_add_after_match_recompiles(self):
+        index = KeywordIndex({"a": ["alpha"]})
+        self.assertEqual(index.match("alpha beta"), {"a"})
+        index.add("b", ["beta"])
+        self.assertEqual(index.match("alpha beta"), {"a", "b"})
+
+    def test_empty_index(self):
+        self.assertEqual(KeywordIndex().match("anything"), frozenset())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the MCP server's customer cache and batches, against a fresh
+sample database.
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import setup_database
+from mcp.mcp_server import MCPServer
+
+
+class SampleDatabaseTest(unittest.TestCase):
+    """Gives each test an MCPServer on a fresh sample database"""
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            conn, cursor = setup_database.create_database()
+            setup_database.add_sample_data(cursor, conn)
+            conn.close()
+            self.server = MCPServer(setup_database.DB_FILE)
+
+    def tearDown(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.server.close()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def ticket_count(self):
+        return self.server._execute_query("SELECT COUNT(*) AS n FROM tickets")[0]["n"]
+
+
+class CustomerCacheTest(SampleDatabaseTest):
+
+    def test_update_invalidates_cached_customer(self):
+        before = self.server.get_customer(1)
+        self.assertTrue(before["success"])
+        self.assertEqual(before["customer"]["email"], "alice@email.com")
+
+        updated = self.server.update_customer(1, {"email": "alice.new@email.com"})
+        self.assertTrue(updated["success"])
+
+        after = self.server.get_customer(1)
+        self.assertEqual(after["customer"]["email"], "alice.new@email.com")
+
+    def test_cached_customer_is_a_copy(self):
+        self.server.get_customer(2)["customer"]["email"] = "changed@email.com"
+        self.assertEqual(self.server.get_customer(2)["customer"]["email"], "bob@email.com")
+
+
+
+class BatchTest(SampleDatabaseTest):
+
+    def test_writes_commit_together(self):
+        before = self.ticket_count()
+        with self.server.batch():
+            self.server.create_ticket(1, "Cannot login", "high")
+            self.server.create_ticket(2, "Billing question", "low")
+        self.assertEqual(self.ticket_count(), before + 2)
+
+    def test_database_error_rolls_back_batch(self):
+        before = self.ticket_count()
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.server.batch():
+                self.assertTrue(self.server.create_ticket(1, "Cannot login")["success"])
+                self.server.create_ticket(2, None)  # issue is NOT NULL
+        self.assertEqual(self.ticket_count(), before)
+
+    def test_error_outside_batch_is_returned(self):
+        result = self.server.create_ticket(2, None)
+        self.assertFalse(result["success"])
+        self.assertIn("Database error", result["error"])
+
+    def test_unknown_customer_does_not_roll_back(self):
+        before = self.ticket_count()
+        with self.server.batch():
+            self.server.create_ticket(1, "Cannot login")
+            self.assertFalse(self.server.create_ticket(999, "Who am I")["success"])
+        self.assertEqual(self.ticket_count(), before + 1)
+
+
+class BatchExecuteTest(SampleDatabaseTest):
+
+    def test_unknown_tool_fails_alone(self):
+        before = self.ticket_count()
+        results = self.server.batch_execute([
+            {'tool': 'create_ticket', 'args': {'customer_id': 1, 'issue': 'Cannot login'}},
+            {'tool': 'no_such_tool'}
+        ])
+        self.assertTrue(results[0]['success'])
+        self.assertFalse(results[1]['success'])
+        self.assertEqual(self.ticket_count(), before + 1)
+
+    def test_database_error_rolls_back_every_call(self):
+        before = self.ticket_count()
+        results = self.server.batch_execute([
+            {'tool': 'create_ticket', 'args': {'customer_id': 1, 'issue': 'Cannot login'}},
+            {'tool': 'create_ticket', 'args': {'customer_id': 2, 'issue': None}}
+        ])
+        self.assertEqual(len(results), 2)
+        self.assertFalse(any(result['success'] for result in results))
+        self.assertEqual(self.ticket_count(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
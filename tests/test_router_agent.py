@@ -0,0 +1,63 @@
+"""
+Tests for the Router Agent's intent helpers (no OpenAI calls are made).
+"""
+
+import json
+import unittest
+
+from agents.router_agent import _complete_prefix, _is_single_lookup
+
+
+class CompletePrefixTest(unittest.TestCase):
+    """Closing a streamed intent analysis early"""
+
+    def test_closes_after_routing_keys(self):
+        partial = (
+            '{"primary_intent": "customer_data", '
+            '"requires_agents": ["Customer Data Agent"], '
+            '"complexity": "simple",'
+        )
+        closed = _complete_prefix(partial)
+        self.assertIsNotNone(closed)
+        self.assertEqual(json.loads(closed)["requires_agents"], ["Customer Data Agent"])
+
+    def test_missing_routing_key(self):
+        partial = '{"primary_intent": "customer_data", "complexity": "simple",'
+        self.assertIsNone(_complete_prefix(partial))
+
+    def test_cut_inside_a_value(self):
+        partial = (
+            '{"primary_intent": "customer_data", "complexity": "simple", '
+            '"requires_agents": ["Customer Data Agent",'
+        )
+        self.assertIsNone(_complete_prefix(partial))
+
+    def test_not_an_object(self):
+        self.assertIsNone(_complete_prefix('["a",'))
+
+
+class SingleLookupFastPathTest(unittest.TestCase):
+    """Which queries skip GPT and go to the Customer Data Agent alone"""
+
+    def test_plain_lookup(self):
+        self.assertTrue(_is_single_lookup("get customer 5"))
+        self.assertTrue(_is_single_lookup("show cust #12"))
+
+    def test_hacked_account(self):
+        self.assertFalse(_is_single_lookup("my account was hacked, customer id 3"))
+
+    def test_double_charge(self):
+        self.assertFalse(_is_single_lookup("customer 5 was charged twice"))
+
+    def test_urgent_outage(self):
+        self.assertFalse(_is_single_lookup("service is down for customer 2, urgent"))
+
+    def test_bug_report(self):
+        self.assertFalse(_is_single_lookup("customer 4 has a bug, not working"))
+
+    def test_amount_is_not_a_customer_id(self):
+        self.assertFalse(_is_single_lookup("i paid 50 dollars"))
+
+
+if __name__ == "__main__":
+    unittest.main()